@@ -1,30 +1,224 @@
 from django.contrib import admin
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connection, models
+from django.utils.functional import cached_property
 
-from .models import DailyCheckin, MITSession, Skill
+from . import search
+from .models import DailyCheckin, MITSession, ReminderLog, ReportExport, SessionArchive, Skill, Team, TeamMembership, UserPreference, WeeklySkillTotal
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that avoids a full COUNT(*) on unfiltered changelists of big tables."""
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, "query", None)
+        if query is not None and not query.where:
+            estimate = _estimated_row_count(self.object_list.model)
+            if estimate is not None and estimate > 10000:
+                return estimate
+        return super().count
+
+
+ROW_COUNT_CACHE_SECONDS = 300
+
+
+def _estimated_row_count(model):
+    table = model._meta.db_table
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+            row = cursor.fetchone()
+        return row[0] if row and row[0] and row[0] > 0 else None
+    if connection.vendor == "sqlite":
+        # SQLite keeps no live row estimate (MAX(rowid) is only a high-water
+        # mark, far off once history is archived), so count for real at most
+        # once every few minutes.
+        return cache.get_or_set(f"admin-row-count:{table}", model._default_manager.count, ROW_COUNT_CACHE_SECONDS)
+    return None
+
+
+class DateHierarchyQuerySet(models.QuerySet):
+    def dates(self, field_name, kind, order="ASC"):
+        # The stock version truncates every row (a Python function call per row on SQLite);
+        # truncating the distinct, indexed dates instead keeps the date hierarchy cheap.
+        truncate = {
+            "year": lambda d: d.replace(month=1, day=1),
+            "month": lambda d: d.replace(day=1),
+            "day": lambda d: d,
+        }[kind]
+        values = self.order_by().values_list(field_name, flat=True).distinct()
+        return sorted({truncate(d) for d in values if d is not None}, reverse=order == "DESC")
+
+
+class InputFilter(admin.SimpleListFilter):
+    """Free-text list filter, used instead of enumerating every owner or skill."""
+
+    template = "admin/input_filter.html"
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def choices(self, changelist):
+        yield {
+            "selected": self.value() is not None,
+            "value": self.value() or "",
+            "query_string": changelist.get_query_string(remove=[self.parameter_name]),
+            "hidden": [(k, v) for k, v in changelist.params.items() if k not in (self.parameter_name, "p")],
+        }
+
+
+class OwnerFilter(InputFilter):
+    title = "owner username"
+    parameter_name = "owner"
+    field_path = "owner__username"
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{self.field_path: self.value()})
+        return queryset
+
+
+class SessionOwnerFilter(OwnerFilter):
+    field_path = "daily_checkin__owner__username"
+
+
+class SkillNameFilter(InputFilter):
+    title = "focus category"
+    parameter_name = "skill_name"
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(skill__name=self.value())
+        return queryset
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
 
 
 class MITSessionInline(admin.TabularInline):
     model = MITSession
     extra = 0
+    raw_id_fields = ("skill",)
 
 
 @admin.register(DailyCheckin)
-class DailyCheckinAdmin(admin.ModelAdmin):
+class DailyCheckinAdmin(LargeTableAdmin):
     list_display = ("owner", "date", "created_at")
+    list_select_related = ("owner",)
     search_fields = ("date", "owner__username")
-    list_filter = ("owner",)
+    list_filter = (OwnerFilter,)
+    date_hierarchy = "date"
+    autocomplete_fields = ("owner",)
     inlines = [MITSessionInline]
 
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        return DateHierarchyQuerySet(self.model, query=qs.query, using=qs.db)
+
 
 @admin.register(MITSession)
-class MITSessionAdmin(admin.ModelAdmin):
+class MITSessionAdmin(LargeTableAdmin):
     list_display = ("daily_checkin", "skill", "title", "planned_minutes", "actual_minutes", "status")
-    list_filter = ("status", "skill", "daily_checkin__owner")
+    list_select_related = ("daily_checkin", "skill")
+    list_filter = ("status", SkillNameFilter, SessionOwnerFilter)
     search_fields = ("title", "miss_reason")
+    raw_id_fields = ("daily_checkin", "skill")
+    # Newest-first by primary key walks the index instead of sorting a three-table join.
+    ordering = ("-pk",)
+
+    def get_search_results(self, request, queryset, search_term):
+        matches = search.session_ids_matching(search_term)
+        if matches is None:
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(pk__in=matches), False
 
 
 @admin.register(Skill)
 class SkillAdmin(admin.ModelAdmin):
     list_display = ("owner", "name", "weekly_goal_minutes", "is_active", "created_at")
-    list_filter = ("owner", "is_active")
+    list_select_related = ("owner",)
+    list_filter = (OwnerFilter, "is_active")
     search_fields = ("name", "description", "owner__username")
+    autocomplete_fields = ("owner",)
+
+
+@admin.register(SessionArchive)
+class SessionArchiveAdmin(admin.ModelAdmin):
+    list_display = ("owner", "year", "session_count", "updated_at")
+    list_select_related = ("owner",)
+    list_filter = ("year",)
+    search_fields = ("owner__username",)
+    readonly_fields = ("owner", "year", "session_count", "created_at", "updated_at")
+
+
+@admin.register(UserPreference)
+class UserPreferenceAdmin(admin.ModelAdmin):
+    list_display = ("owner", "reminders_enabled", "remind_missing_checkin", "remind_open_sessions", "updated_at")
+    list_select_related = ("owner",)
+    list_filter = ("reminders_enabled",)
+    search_fields = ("owner__username",)
+    autocomplete_fields = ("owner",)
+
+
+@admin.register(ReminderLog)
+class ReminderLogAdmin(LargeTableAdmin):
+    list_display = ("owner", "date", "missing_checkin", "open_sessions", "sent_at")
+    list_select_related = ("owner",)
+    list_filter = (OwnerFilter,)
+    date_hierarchy = "date"
+    raw_id_fields = ("owner",)
+
+
+@admin.register(ReportExport)
+class ReportExportAdmin(admin.ModelAdmin):
+    list_display = ("owner", "format", "month", "all_users", "status", "row_count", "created_at", "expires_at")
+    list_select_related = ("owner",)
+    list_filter = ("status", "format")
+    raw_id_fields = ("owner",)
+
+
+class TeamMembershipInline(admin.TabularInline):
+    model = TeamMembership
+    extra = 0
+    raw_id_fields = ("user",)
+
+
+@admin.register(Team)
+class TeamAdmin(admin.ModelAdmin):
+    list_display = ("name", "slug", "member_count", "created_at")
+    search_fields = ("name", "slug")
+    prepopulated_fields = {"slug": ("name",)}
+    inlines = [TeamMembershipInline]
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(member_count=models.Count("memberships"))
+
+    @admin.display(ordering="member_count")
+    def member_count(self, obj):
+        return obj.member_count
+
+
+@admin.register(TeamMembership)
+class TeamMembershipAdmin(LargeTableAdmin):
+    list_display = ("team", "user", "role", "joined_at")
+    list_select_related = ("team", "user")
+    list_filter = ("role", "team")
+    search_fields = ("user__username", "team__name")
+    raw_id_fields = ("team", "user")
+
+
+@admin.register(WeeklySkillTotal)
+class WeeklySkillTotalAdmin(LargeTableAdmin):
+    list_display = ("skill", "week_start", "completed_minutes", "completed_sessions")
+    list_select_related = ("skill",)
+    date_hierarchy = "week_start"
+    raw_id_fields = ("skill",)
+    readonly_fields = ("skill", "week_start", "completed_minutes", "completed_sessions")
@@ -0,0 +1,452 @@
+"""Columnar archive files for cold MITSession history.
+
+Each archive holds one owner's sessions for one calendar year. The file is a
+small header followed by fixed-width column arrays (little-endian), so a
+reader can mmap it and slice columns without parsing rows. Text columns are
+stored as a uint32 offsets array plus a UTF-8 blob.
+"""
+
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import defaultdict
+from datetime import date, datetime, timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.functions import ExtractYear
+
+from . import rollup, search
+from .cache import bump_cache_version
+from .models import DailyCheckin, MITSession, SessionArchive, Skill
+
+MAGIC = b"FTTA"
+VERSION = 1
+HEADER = struct.Struct("<4sHHII")
+COLUMN = struct.Struct("<16s1s3xQQ")
+
+STATUS_CODES = [value for value, _label in MITSession.Status.choices]
+COMPLETED_CODE = STATUS_CODES.index(MITSession.Status.COMPLETED)
+
+# (name, typecode) — typecode "s" marks a text column.
+COLUMNS = [
+    ("id", "q"),
+    ("checkin_id", "q"),
+    ("date", "i"),
+    ("skill_id", "q"),
+    ("planned_minutes", "i"),
+    ("actual_minutes", "i"),
+    ("status", "b"),
+    ("started_at", "d"),
+    ("ended_at", "d"),
+    ("created_at", "d"),
+    ("title", "s"),
+    ("miss_reason", "s"),
+    ("category", "s"),
+    ("skill_name", "s"),
+]
+
+
+def archive_root():
+    return Path(getattr(settings, "SESSION_ARCHIVE_ROOT", Path(settings.BASE_DIR) / "archive"))
+
+
+def archive_path(owner_id, year):
+    return archive_root() / str(owner_id) / f"{year}.ftta"
+
+
+def _to_epoch(value):
+    return value.timestamp() if value else math.nan
+
+
+def _from_epoch(value):
+    return None if math.isnan(value) else datetime.fromtimestamp(value, tz=dt_timezone.utc)
+
+
+def _session_row(session):
+    return {
+        "id": session.pk,
+        "checkin_id": session.daily_checkin_id,
+        "date": session.daily_checkin.date,
+        "skill_id": session.skill_id,
+        "skill_name": session.skill.name if session.skill else None,
+        "planned_minutes": session.planned_minutes,
+        "actual_minutes": session.actual_minutes,
+        "status": session.status,
+        "started_at": session.started_at,
+        "ended_at": session.ended_at,
+        "created_at": session.created_at,
+        "title": session.title,
+        "miss_reason": session.miss_reason,
+        "category": session.category,
+    }
+
+
+def _encode_row(row):
+    return {
+        "id": row["id"],
+        "checkin_id": row["checkin_id"],
+        "date": row["date"].toordinal(),
+        "skill_id": -1 if row["skill_id"] is None else row["skill_id"],
+        "planned_minutes": row["planned_minutes"],
+        "actual_minutes": -1 if row["actual_minutes"] is None else row["actual_minutes"],
+        "status": STATUS_CODES.index(row["status"]),
+        "started_at": _to_epoch(row["started_at"]),
+        "ended_at": _to_epoch(row["ended_at"]),
+        "created_at": _to_epoch(row["created_at"]),
+        "title": row["title"],
+        "miss_reason": row["miss_reason"],
+        "category": row["category"],
+        "skill_name": row["skill_name"] or "",
+    }
+
+
+def _decode_row(raw):
+    return {
+        "id": raw["id"],
+        "checkin_id": raw["checkin_id"],
+        "date": date.fromordinal(raw["date"]),
+        "skill_id": None if raw["skill_id"] < 0 else raw["skill_id"],
+        "skill_name": raw["skill_name"] or None,
+        "planned_minutes": raw["planned_minutes"],
+        "actual_minutes": None if raw["actual_minutes"] < 0 else raw["actual_minutes"],
+        "status": STATUS_CODES[raw["status"]],
+        "started_at": _from_epoch(raw["started_at"]),
+        "ended_at": _from_epoch(raw["ended_at"]),
+        "created_at": _from_epoch(raw["created_at"]),
+        "title": raw["title"],
+        "miss_reason": raw["miss_reason"],
+        "category": raw["category"],
+    }
+
+
+def _column_bytes(typecode, values):
+    if typecode == "s":
+        offsets, blob = array("I", [0]), bytearray()
+        for value in values:
+            blob += value.encode("utf-8")
+            offsets.append(len(blob))
+        if sys.byteorder == "big":
+            offsets.byteswap()
+        return offsets.tobytes() + bytes(blob)
+    data = array(typecode, values)
+    if sys.byteorder == "big":
+        data.byteswap()
+    return data.tobytes()
+
+
+def write_archive(path, rows):
+    """Write decoded session rows atomically to ``path``."""
+    rows = [_encode_row(r) for r in sorted(rows, key=lambda r: (r["date"], r["id"]))]
+    chunks = [_column_bytes(typecode, [r[name] for r in rows]) for name, typecode in COLUMNS]
+
+    # Columns start on 8-byte boundaries so mmapped views can be cast in place.
+    offset = HEADER.size + COLUMN.size * len(COLUMNS)
+    directory = []
+    for index, ((name, typecode), chunk) in enumerate(zip(COLUMNS, chunks)):
+        directory.append(COLUMN.pack(name.encode("ascii"), typecode.encode("ascii"), offset, len(chunk)))
+        chunks[index] = chunk + b"\0" * (-len(chunk) % 8)
+        offset += len(chunks[index])
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as fh:
+        fh.write(HEADER.pack(MAGIC, VERSION, 0, len(rows), len(COLUMNS)))
+        for entry in directory:
+            fh.write(entry)
+        for chunk in chunks:
+            fh.write(chunk)
+    os.replace(tmp_path, path)
+
+
+class ArchiveFile:
+    """Read-only, memory-mapped view over one archive file."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as fh:
+            self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _reserved, self.row_count, column_count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a session archive (v{VERSION}).")
+        self._columns = {}
+        for index in range(column_count):
+            name, typecode, offset, length = COLUMN.unpack_from(self._map, HEADER.size + index * COLUMN.size)
+            self._columns[name.rstrip(b"\0").decode("ascii")] = (typecode.decode("ascii"), offset, length)
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def column(self, name):
+        typecode, offset, length = self._columns[name]
+        with memoryview(self._map) as whole:
+            view = whole[offset:offset + length]
+        if typecode != "s":
+            if sys.byteorder == "big":
+                data = array(typecode, view.tobytes())
+                data.byteswap()
+                return data
+            return view.cast(typecode)
+        offsets_len = (self.row_count + 1) * 4
+        offsets = array("I", view[:offsets_len].tobytes())
+        if sys.byteorder == "big":
+            offsets.byteswap()
+        blob = view[offsets_len:]
+        return [bytes(blob[offsets[i]:offsets[i + 1]]).decode("utf-8") for i in range(self.row_count)]
+
+    def rows(self):
+        columns = {}
+        for name, _typecode in COLUMNS:
+            values = self.column(name)
+            if isinstance(values, memoryview):
+                columns[name] = values.tolist()
+                values.release()
+            else:
+                columns[name] = values
+        for i in range(self.row_count):
+            yield _decode_row({name: values[i] for name, values in columns.items()})
+
+
+def archived_rows(owner, year=None, month=None):
+    """Yield decoded archived rows for ``owner``, optionally limited to a year/month."""
+    archives = SessionArchive.objects.filter(owner=owner).order_by("year")
+    if year is not None:
+        archives = archives.filter(year=year)
+    for row in entry_rows(archives):
+        if month is None or row["date"].month == month:
+            yield row
+
+
+def entry_rows(entries):
+    """Yield decoded rows for each archive entry (anything with ``owner_id`` and ``year``), skipping missing files.
+
+    ``skill_name`` is the skill's current name; the name stored at archive
+    time is only used once the skill itself has been deleted.
+    """
+    for entry in entries:
+        path = archive_path(entry.owner_id, entry.year)
+        if not path.exists():
+            continue
+        with ArchiveFile(path) as archive:
+            rows = list(archive.rows())
+        names = dict(Skill.objects.filter(pk__in={row["skill_id"] for row in rows if row["skill_id"] is not None}).values_list("pk", "name"))
+        for row in rows:
+            row["skill_name"] = names.get(row["skill_id"], row["skill_name"])
+            yield row
+
+
+def _archive_columns(owner, *names):
+    """Yield one list per column in ``names`` for each of the owner's archive files, decoding nothing else."""
+    for entry in SessionArchive.objects.filter(owner=owner).order_by("year"):
+        path = archive_path(owner.pk, entry.year)
+        if not path.exists():
+            continue
+        with ArchiveFile(path) as archive:
+            columns = []
+            for name in names:
+                values = archive.column(name)
+                if isinstance(values, memoryview):
+                    # Copied out, so the view is released before the file is unmapped.
+                    columns.append(values.tolist())
+                    values.release()
+                else:
+                    columns.append(values)
+        yield columns
+
+
+def archived_skill_ids(owner):
+    """Ids of the skills the owner's archived sessions refer to."""
+    ids = set()
+    for (skill_ids,) in _archive_columns(owner, "skill_id"):
+        ids.update(skill_ids)
+    ids.discard(-1)
+    return ids
+
+
+def monthly_completed_minutes(owner):
+    """{first-of-month date: completed actual minutes} across the owner's archives."""
+    totals = defaultdict(int)
+    for dates, statuses, actuals in _archive_columns(owner, "date", "status", "actual_minutes"):
+        for day, status, actual in zip(dates, statuses, actuals):
+            if status == COMPLETED_CODE:
+                totals[date.fromordinal(day).replace(day=1)] += max(actual, 0)
+    return dict(totals)
+
+
+def summary_rows(owner, year=None, month=None):
+    """Archived rows grouped like ``monthly_summary``'s month/skill aggregate."""
+    grouped = {}
+    for row in archived_rows(owner, year=year, month=month):
+        key = (row["date"].replace(day=1), row["skill_name"])
+        bucket = grouped.setdefault(key, {"month": key[0], "skill__name": key[1], "count": 0, "completed": 0, "planned_minutes": 0, "actual_minutes": None})
+        bucket["count"] += 1
+        bucket["planned_minutes"] += row["planned_minutes"]
+        if row["status"] == MITSession.Status.COMPLETED:
+            bucket["completed"] += 1
+        if row["actual_minutes"] is not None:
+            bucket["actual_minutes"] = (bucket["actual_minutes"] or 0) + row["actual_minutes"]
+    return list(grouped.values())
+
+
+def merge_summary_rows(rows, archived):
+    """Fold archived summary rows into live ones, keeping ``monthly_summary``'s ordering."""
+    merged = {}
+    for row in list(rows) + list(archived):
+        key = (row["month"], row["skill__name"])
+        if key not in merged:
+            merged[key] = dict(row)
+            continue
+        bucket = merged[key]
+        for field in ("count", "completed", "planned_minutes", "actual_minutes"):
+            if row[field] is not None:
+                bucket[field] = (bucket[field] or 0) + row[field]
+    ordered = sorted(merged.values(), key=lambda r: r["skill__name"] or "")
+    ordered.sort(key=lambda r: r["month"], reverse=True)
+    return ordered
+
+
+def completed_days(owner, before):
+    """{date: all sessions completed} for archived check-ins older than ``before``."""
+    days = {}
+    cutoff = before.toordinal()
+    for dates, statuses in _archive_columns(owner, "date", "status"):
+        for day, status in zip(dates, statuses):
+            if day < cutoff:
+                day = date.fromordinal(day)
+                days[day] = days.get(day, True) and status == COMPLETED_CODE
+    return days
+
+
+def _pending_path(path):
+    return path.with_name(path.name + ".pending")
+
+
+def recover_pending(min_age_seconds=3600):
+    """Publish or discard archive files staged by a run that died between commit and publish.
+
+    A staged file whose row count matches its committed ``SessionArchive``
+    belongs to a committed run and is published; any other was rolled back
+    and is removed. Only files older than ``min_age_seconds`` are touched, so
+    a concurrent run's staged file is left alone.
+    """
+    cutoff = datetime.now().timestamp() - min_age_seconds
+    for pending in archive_root().glob("*/*.ftta.pending"):
+        if pending.stat().st_mtime > cutoff:
+            continue
+        path = pending.with_name(pending.name.removesuffix(".pending"))
+        entry = SessionArchive.objects.filter(owner_id=int(pending.parent.name), year=int(path.stem)).first()
+        with ArchiveFile(pending) as staged:
+            committed = entry is not None and staged.row_count == entry.session_count
+        if committed:
+            os.replace(pending, path)
+        else:
+            pending.unlink()
+
+
+def archive_sessions(cutoff, owner=None):
+    """Move sessions dated before ``cutoff`` into per-owner, per-year archives.
+
+    One (owner, year) is loaded and written at a time, so memory is bounded
+    by the largest single year rather than everything being archived. Each
+    file is staged next to the live one and only swapped in once its
+    transaction commits, so a rolled-back batch never leaves still-live
+    sessions in an archive. Returns the number of sessions archived.
+    """
+    recover_pending()
+    sessions = MITSession.objects.filter(daily_checkin__date__lt=cutoff, daily_checkin__owner__isnull=False)
+    if owner is not None:
+        sessions = sessions.filter(daily_checkin__owner=owner)
+    groups = list(
+        sessions.annotate(year=ExtractYear("daily_checkin__date"))
+        .values_list("daily_checkin__owner_id", "year")
+        .distinct()
+        .order_by("daily_checkin__owner_id", "year")
+    )
+
+    archived = 0
+    for owner_id, year in groups:
+        batch = list(sessions.select_related("daily_checkin", "skill").filter(daily_checkin__owner_id=owner_id, daily_checkin__date__year=year))
+        path = archive_path(owner_id, year)
+        pending = _pending_path(path)
+        try:
+            with transaction.atomic():
+                entry, _created = SessionArchive.objects.select_for_update().get_or_create(owner_id=owner_id, year=year)
+                rows = {}
+                if path.exists():
+                    with ArchiveFile(path) as existing:
+                        rows = {row["id"]: row for row in existing.rows()}
+                for session in batch:
+                    rows[session.pk] = _session_row(session)
+                write_archive(pending, rows.values())
+                entry.session_count = len(rows)
+                entry.save(update_fields=["session_count", "updated_at"])
+                # Weekly totals keep counting archived history; the search index
+                # and dashboard cache are updated once for the batch, not per row.
+                session_ids = [s.pk for s in batch]
+                with rollup.paused(), search.paused():
+                    MITSession.objects.filter(pk__in=session_ids).delete()
+                search.unindex_sessions(session_ids)
+                bump_cache_version(owner_id)
+                transaction.on_commit(lambda pending=pending, path=path: os.replace(pending, path))
+        except Exception:
+            pending.unlink(missing_ok=True)
+            raise
+        archived += len(batch)
+    return archived
+
+
+def restore_sessions(owner, year):
+    """Move one archive back into MITSession rows and delete the file.
+
+    Missing check-ins are recreated by date; deleted skills restore as unassigned.
+    """
+    path = archive_path(owner.pk, year)
+    entry = SessionArchive.objects.filter(owner=owner, year=year).first()
+    if not entry or not path.exists():
+        return 0
+
+    with ArchiveFile(path) as archive:
+        rows = list(archive.rows())
+
+    with transaction.atomic():
+        checkins = {c.date: c for c in DailyCheckin.objects.filter(owner=owner, date__year=year)}
+        skill_ids = set(Skill.objects.filter(owner=owner, pk__in={r["skill_id"] for r in rows if r["skill_id"]}).values_list("pk", flat=True))
+        restored = []
+        for row in rows:
+            checkin = checkins.get(row["date"])
+            if checkin is None:
+                checkin = checkins[row["date"]] = DailyCheckin.objects.create(owner=owner, date=row["date"])
+            restored.append(MITSession(
+                id=row["id"],
+                daily_checkin=checkin,
+                skill_id=row["skill_id"] if row["skill_id"] in skill_ids else None,
+                category=row["category"],
+                title=row["title"],
+                planned_minutes=row["planned_minutes"],
+                actual_minutes=row["actual_minutes"],
+                status=row["status"],
+                miss_reason=row["miss_reason"],
+                started_at=row["started_at"],
+                ended_at=row["ended_at"],
+            ))
+        MITSession.objects.bulk_create(restored, batch_size=1000)
+        created_at = {row["id"]: row["created_at"] for row in rows if row["created_at"]}
+        for session in restored:
+            if session.pk in created_at:
+                session.created_at = created_at[session.pk]
+        MITSession.objects.bulk_update([s for s in restored if s.pk in created_at], ["created_at"], batch_size=1000)
+        search.index_sessions(restored)
+        bump_cache_version(owner.pk)
+        entry.delete()
+    path.unlink()
+    return len(restored)
@@ -0,0 +1,63 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import transaction
+
+_pending = threading.local()
+
+
+def fragment_cache():
+    """The cache ``{% cache %}`` uses: the ``template_fragments`` alias if configured, else the default."""
+    return caches["template_fragments" if "template_fragments" in settings.CACHES else "default"]
+
+
+def dashboard_version_key(user_id):
+    return f"dashboard-version:{user_id}"
+
+
+def current_version(user_id):
+    return cache.get_or_set(dashboard_version_key(user_id), time.time_ns, None)
+
+
+def bump_cache_version(user_id):
+    """Invalidate every cached dashboard aggregate for one user, once the current transaction commits.
+
+    Bumping before commit would let a concurrent request read the new version,
+    compute from the old rows and cache them under it.
+    """
+    if user_id is None:
+        return
+    pending = getattr(_pending, "user_ids", None)
+    if pending is not None:
+        pending.add(user_id)
+        return
+    transaction.on_commit(lambda: _set_new_version(user_id))
+
+
+def _set_new_version(user_id):
+    # A plain set rather than incr: incr is a read-modify-write on some
+    # backends (the file cache), so two workers could both land on the same
+    # value. A fresh time-based version never repeats one cached earlier.
+    cache.set(dashboard_version_key(user_id), time.time_ns(), None)
+
+
+@contextmanager
+def coalesced_bumps():
+    """Collapse every ``bump_cache_version`` inside the block into one bump per user at exit.
+
+    A form save touching several sessions would otherwise rewrite the same
+    version key once per row.
+    """
+    if getattr(_pending, "user_ids", None) is not None:
+        yield
+        return
+    _pending.user_ids = set()
+    try:
+        yield
+    finally:
+        user_ids, _pending.user_ids = _pending.user_ids, None
+        for user_id in user_ids:
+            bump_cache_version(user_id)
@@ -0,0 +1,502 @@
+"""Cross-checks for the dashboard and report figures.
+
+``Reference`` recomputes every number ``home``, ``monthly_summary`` and
+``current_streak`` show, the slow way: one plain load of the user's rows
+(live sessions, archived sessions, check-ins, skills) and loops over them.
+``audit_user`` compares the two and returns the differences, so it can run
+against real accounts (``manage.py audit_consistency``) or against randomized
+histories built by ``build_history`` / ``check_history``. Generated histories
+are written for real, so they only ever run inside ``isolated_environment``
+or a test case.
+"""
+
+import random
+import tempfile
+import uuid
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from fractions import Fraction
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.utils.functional import cached_property
+
+from . import archive, reports
+from .dashboard import DashboardData, current_streak
+from .models import DailyCheckin, MITSession, SessionArchive, Skill, WeeklySkillTotal
+from .periods import Periods
+
+COMPLETED = MITSession.Status.COMPLETED
+STATUSES = [value for value, _label in MITSession.Status.choices]
+ISOLATED_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "consistency-audit"}}
+
+
+def _rate(part, whole):
+    return round((part / whole) * 100, 1) if whole else 0
+
+
+def _sum_or_none(values):
+    values = [v for v in values if v is not None]
+    return sum(values) if values else None
+
+
+def _days(first, last):
+    return [first + timedelta(days=offset) for offset in range((last - first).days + 1)]
+
+
+class Reference:
+    """Dashboard and report figures for one user, recomputed from raw rows.
+
+    Nothing here reads the weekly rollup, the cache or an aggregate query;
+    the point is to disagree loudly when any of those drift.
+    """
+
+    def __init__(self, user, periods):
+        self.user = user
+        self.periods = periods
+        self.today = periods.today
+        self.week_start = periods.week_start
+        self.week_end = periods.week_end
+
+    @cached_property
+    def checkin_dates(self):
+        return set(DailyCheckin.objects.filter(owner=self.user).values_list("date", flat=True))
+
+    @cached_property
+    def live(self):
+        rows = MITSession.objects.filter(daily_checkin__owner=self.user).values(
+            "id", "daily_checkin__date", "skill_id", "skill__name", "planned_minutes", "actual_minutes", "status"
+        )
+        return [
+            {
+                "id": row["id"],
+                "date": row["daily_checkin__date"],
+                "skill_id": row["skill_id"],
+                "skill_name": row["skill__name"],
+                "planned_minutes": row["planned_minutes"],
+                "actual_minutes": row["actual_minutes"],
+                "status": row["status"],
+            }
+            for row in rows
+        ]
+
+    @cached_property
+    def archived(self):
+        return list(archive.archived_rows(self.user))
+
+    @cached_property
+    def skills(self):
+        return list(Skill.objects.filter(owner=self.user))
+
+    @property
+    def all_rows(self):
+        return self.live + self.archived
+
+    @cached_property
+    def week_rows(self):
+        return [r for r in self.live if self.week_start <= r["date"] <= self.week_end]
+
+    @cached_property
+    def month_rows(self):
+        return [r for r in self.live if (r["date"].year, r["date"].month) == (self.today.year, self.today.month)]
+
+    def summary(self):
+        completed = [r for r in self.week_rows if r["status"] == COMPLETED]
+        return {
+            "total": len(self.week_rows),
+            "completed": len(completed),
+            "actual_minutes": _sum_or_none(r["actual_minutes"] for r in completed),
+        }
+
+    def completion_rate(self):
+        summary = self.summary()
+        return _rate(summary["completed"], summary["total"])
+
+    def monthly_completion_rate(self):
+        return _rate(sum(1 for r in self.month_rows if r["status"] == COMPLETED), len(self.month_rows))
+
+    def current_streak(self):
+        live_days, archived_days = defaultdict(list), defaultdict(list)
+        for row in self.live:
+            live_days[row["date"]].append(row["status"] == COMPLETED)
+        for row in self.archived:
+            archived_days[row["date"]].append(row["status"] == COMPLETED)
+        streak, day = 0, self.today
+        while day in self.checkin_dates:
+            done = live_days.get(day) or archived_days.get(day)
+            if not done or not all(done):
+                break
+            streak += 1
+            day -= timedelta(days=1)
+        return streak
+
+    def daily_trend(self):
+        days = [self.week_start + timedelta(days=offset) for offset in range(7)]
+        minutes = [sum(r["actual_minutes"] or 0 for r in self.week_rows if r["date"] == day) for day in days]
+        return [day.strftime("%a %d") for day in days], minutes
+
+    def monthly_trend(self):
+        totals = defaultdict(int)
+        for row in self.all_rows:
+            if row["status"] == COMPLETED:
+                totals[row["date"].replace(day=1)] += row["actual_minutes"] or 0
+        months = sorted(totals)
+        return [m.strftime("%b %Y") for m in months], [totals[m] for m in months]
+
+    def category_mix(self):
+        return dict(Counter(r["skill_name"] or "(No category)" for r in self.week_rows if r["status"] == COMPLETED))
+
+    def weekly_minutes(self):
+        """{(skill_id, monday): (minutes, sessions)} over live and archived completed rows."""
+        totals = defaultdict(lambda: [0, 0])
+        for row in self.all_rows:
+            if row["status"] == COMPLETED and row["skill_id"]:
+                total = totals[(row["skill_id"], row["date"] - timedelta(days=row["date"].weekday()))]
+                total[0] += row["actual_minutes"] or 0
+                total[1] += 1
+        return {key: tuple(value) for key, value in totals.items()}
+
+    def _completed_minutes(self, skill, first, last):
+        return sum(
+            r["actual_minutes"] or 0
+            for r in self.all_rows
+            if r["skill_id"] == skill.pk and r["status"] == COMPLETED and first <= r["date"] <= last
+        )
+
+    def goal_progress(self, weeks=8):
+        """Pacing worked out from the calendar and the rows rather than from ``forecast``'s arithmetic.
+
+        Elapsed and remaining days are counted, not subtracted; the projection
+        is exact until the final rounding; the per-day need is the smallest
+        whole number of minutes that reaches the goal; past weeks are the
+        Mondays of every day the skill existed within the window.
+        """
+        elapsed = _days(self.week_start, self.today)
+        remaining_days = _days(self.today, self.week_end)
+        window_start = self.week_start - timedelta(days=7 * weeks)
+        progress = []
+        for skill in sorted((s for s in self.skills if s.is_active), key=lambda s: s.name):
+            goal = skill.weekly_goal_minutes or 0
+            actual = self._completed_minutes(skill, self.week_start, self.week_end)
+            projected = round(Fraction(actual * 7, len(elapsed)))
+            remaining = max(goal - actual, 0)
+            existed = _days(max(skill.created_at.date(), window_start), self.week_start - timedelta(days=1))
+            past_weeks = sorted({day - timedelta(days=day.weekday()) for day in existed})
+            weeks_hit = [w for w in past_weeks if goal and self._completed_minutes(skill, w, w + timedelta(days=6)) >= goal]
+            progress.append({
+                "skill_id": skill.pk,
+                "name": skill.name,
+                "goal": goal,
+                "actual": actual,
+                "pct": _rate(actual, goal),
+                "projected": projected,
+                # The card shows the projection, so "on pace" must agree with it.
+                "on_pace": projected >= goal,
+                "remaining": remaining,
+                "days_left": len(remaining_days),
+                "needed_per_day": -(-remaining // len(remaining_days)),
+                "weeks_considered": len(past_weeks),
+                "weeks_hit": len(weeks_hit),
+                "hit_rate": _rate(len(weeks_hit), len(past_weeks)) if goal and past_weeks else None,
+            })
+        return progress
+
+    def incomplete_sessions(self):
+        pending = [r for r in self.week_rows if r["status"] != COMPLETED]
+        return [r["id"] for r in sorted(pending, key=lambda r: (-r["date"].toordinal(), r["id"]))]
+
+    def recent_dates(self, limit=9):
+        completed = sorted((r for r in self.live if r["status"] == COMPLETED), key=lambda r: r["date"], reverse=True)
+        return [r["date"] for r in completed[:limit]]
+
+    def top_focus(self):
+        """(names tied for the month's most minutes, those minutes), or ``None`` when nothing named has minutes."""
+        minutes = defaultdict(list)
+        for row in self.month_rows:
+            if row["status"] == COMPLETED:
+                minutes[row["skill_name"]].append(row["actual_minutes"])
+        totals = {name: _sum_or_none(values) or 0 for name, values in minutes.items() if name}
+        best = max(totals.values(), default=0)
+        if best <= 0:
+            return None
+        return {name for name, total in totals.items() if total == best}, best
+
+    def summary_rows(self, year=None, month=None):
+        grouped = {}
+        for row in self.all_rows:
+            if year is not None and (row["date"].year, row["date"].month) != (year, month):
+                continue
+            bucket = grouped.setdefault((row["date"].replace(day=1), row["skill_name"]), [0, 0, 0, []])
+            bucket[0] += 1
+            bucket[1] += row["status"] == COMPLETED
+            bucket[2] += row["planned_minutes"]
+            bucket[3].append(row["actual_minutes"])
+        return {key: (count, completed, planned, _sum_or_none(actual)) for key, (count, completed, planned, actual) in grouped.items()}
+
+
+def _check(mismatches, label, expected, actual):
+    if expected != actual:
+        mismatches.append(f"{label}: expected {expected!r}, got {actual!r}")
+
+
+def _check_dashboard(mismatches, label, reference, data):
+    _check(mismatches, f"{label} summary", reference.summary(), data.summary)
+    _check(mismatches, f"{label} completion_rate", reference.completion_rate(), data.completion_rate)
+    _check(mismatches, f"{label} monthly_completion_rate", reference.monthly_completion_rate(), data.monthly_completion_rate)
+    _check(mismatches, f"{label} current_streak", reference.current_streak(), data.current_streak)
+    _check(mismatches, f"{label} daily_trend", reference.daily_trend(), tuple(data.daily_trend))
+    _check(mismatches, f"{label} monthly_trend", reference.monthly_trend(), tuple(data.monthly_trend))
+    labels, counts = data.category_mix
+    _check(mismatches, f"{label} category_mix", reference.category_mix(), dict(zip(labels, counts)))
+    _check(mismatches, f"{label} category_mix order", sorted(counts, reverse=True), list(counts))
+    _check(mismatches, f"{label} goal_progress", reference.goal_progress(), data.goal_progress)
+    _check(mismatches, f"{label} incomplete_sessions", reference.incomplete_sessions(), [s.pk for s in data.incomplete_sessions])
+    # Equal (date, category) ties may come back in any order, so only the dates are compared.
+    _check(mismatches, f"{label} recent_mits", reference.recent_dates(), [s.daily_checkin.date for s in data.recent_mits])
+
+    top = reference.top_focus()
+    narrative = data.monthly_narrative
+    if top is None:
+        if narrative.startswith("Top focus so far:"):
+            mismatches.append(f"{label} monthly_narrative: expected no top focus, got {narrative!r}")
+    elif not any(narrative.startswith(f"Top focus so far: {name} ({top[1]} min).") for name in top[0]):
+        mismatches.append(f"{label} monthly_narrative: expected one of {sorted(top[0])} at {top[1]} min, got {narrative!r}")
+
+
+def _summary_map(rows):
+    return {
+        (row["month"], row["skill__name"]): (row["count"], row["completed"], row["planned_minutes"], row["actual_minutes"])
+        for row in rows
+    }
+
+
+def audit_user(user, periods):
+    """Every difference between the app's figures and ``Reference`` for one user and day, as readable strings.
+
+    On a live database, writes landing between the two reads can show up as
+    one-off differences; re-run a user before trusting a single report.
+    """
+    reference = Reference(user, periods)
+    mismatches = []
+
+    _check_dashboard(mismatches, "home", reference, DashboardData(user, periods, use_cache=False))
+    _check_dashboard(mismatches, "home (cached)", reference, DashboardData(user, periods))
+    _check(mismatches, "current_streak()", reference.current_streak(), current_streak(user, periods.today))
+
+    stored = {
+        (t.skill_id, t.week_start): (t.completed_minutes, t.completed_sessions)
+        for t in WeeklySkillTotal.objects.filter(skill__owner=user)
+        if t.completed_minutes or t.completed_sessions
+    }
+    skill_ids = {s.pk for s in reference.skills}
+    expected = {key: value for key, value in reference.weekly_minutes().items() if key[0] in skill_ids}
+    for key in sorted(set(stored) | set(expected)):
+        _check(mismatches, f"weekly total {key[0]}/{key[1]}", expected.get(key), stored.get(key))
+
+    rows = list(reports.monthly_summary_rows(user))
+    _check(mismatches, "monthly_summary", reference.summary_rows(), _summary_map(rows))
+    _check(mismatches, "monthly_summary order", sorted((r["month"] for r in rows), reverse=True), [r["month"] for r in rows])
+    this_month = {"year": periods.today.year, "month": periods.today.month}
+    _check(mismatches, "monthly_summary (this month)", reference.summary_rows(**this_month), _summary_map(reports.monthly_summary_rows(user, **this_month)))
+    return mismatches
+
+
+BASE_DATE = date(2024, 1, 1)
+OPERATIONS = ("add", "edit", "edit", "delete", "move", "delete_skill", "archive", "restore")
+
+
+def build_history(integer, choice):
+    """A randomized history spec, drawn through ``integer(low, high)`` and ``choice(options)``.
+
+    Taking the two draw functions keeps one generator for both ``random.Random``
+    and Hypothesis strategies. Indexes in the spec are taken modulo whatever
+    exists when they are applied, so every shrunk spec stays valid.
+    """
+    spec = {"today": integer(0, 730), "skills": [], "days": [], "operations": [], "recheck": integer(0, 10)}
+    for _ in range(integer(1, 4)):
+        spec["skills"].append({"goal": choice([0, 30, 60, 120, 300]), "active": integer(0, 4) > 0, "age": integer(0, 420)})
+    for _ in range(integer(0, 30)):
+        # Most days sit around today so streaks, weeks and months fill up; the rest reach back over a year.
+        offset = integer(-3, 14) if integer(0, 3) else integer(15, 420)
+        sessions = [
+            {
+                "skill": integer(-1, 3),
+                "status": choice(STATUSES),
+                "planned": integer(0, 120),
+                "actual": choice([None, 0, 15, 25, 60, 90]),
+            }
+            for _ in range(integer(0, 3))
+        ]
+        spec["days"].append({"offset": offset, "sessions": sessions})
+    for _ in range(integer(0, 12)):
+        spec["operations"].append({
+            "kind": choice(OPERATIONS),
+            "target": integer(0, 1000),
+            "skill": integer(-1, 3),
+            "status": choice(STATUSES),
+            "actual": choice([None, 0, 10, 45, 120]),
+            "offset": integer(-3, 420),
+        })
+    return spec
+
+
+def random_history(rng):
+    return build_history(rng.randint, rng.choice)
+
+
+def history_strategy():
+    """Hypothesis strategy yielding ``build_history`` specs (requires ``hypothesis``)."""
+    from hypothesis import strategies as st
+
+    @st.composite
+    def histories(draw):
+        return build_history(lambda low, high: draw(st.integers(low, high)), lambda options: draw(st.sampled_from(options)))
+
+    return histories()
+
+
+def _pick(items, index):
+    return items[index % len(items)] if items else None
+
+
+def _apply_operation(user, today, operation):
+    skills = list(Skill.objects.filter(owner=user).order_by("pk"))
+    skill = None if operation["skill"] < 0 else _pick(skills, operation["skill"])
+    sessions = list(MITSession.objects.filter(daily_checkin__owner=user).order_by("pk"))
+    checkins = list(DailyCheckin.objects.filter(owner=user).order_by("pk"))
+    kind, target = operation["kind"], operation["target"]
+
+    if kind == "add" and checkins:
+        MITSession.objects.create(
+            daily_checkin=_pick(checkins, target), skill=skill, status=operation["status"], planned_minutes=30, actual_minutes=operation["actual"]
+        )
+    elif kind == "edit" and sessions:
+        # A fresh instance, as the check-in form would load it.
+        session = MITSession.objects.get(pk=_pick(sessions, target).pk)
+        session.status, session.actual_minutes, session.skill = operation["status"], operation["actual"], skill
+        session.save()
+    elif kind == "delete" and sessions:
+        _pick(sessions, target).delete()
+    elif kind == "move" and checkins:
+        checkin = _pick(checkins, target)
+        new_date = today - timedelta(days=operation["offset"])
+        if not DailyCheckin.objects.filter(owner=user, date=new_date).exists():
+            checkin.date = new_date
+            checkin.save()
+    elif kind == "delete_skill" and skills:
+        _pick(skills, target).delete()
+    elif kind == "archive":
+        archive.archive_sessions(today - timedelta(days=operation["offset"]), owner=user)
+    elif kind == "restore":
+        entry = _pick(list(SessionArchive.objects.filter(owner=user).order_by("year")), target)
+        if entry is not None:
+            archive.restore_sessions(user, entry.year)
+
+
+def _load_history(spec):
+    today = BASE_DATE + timedelta(days=spec["today"])
+    user = get_user_model().objects.create(username=f"audit-{uuid.uuid4().hex[:12]}")
+    skills = []
+    for index, entry in enumerate(spec["skills"]):
+        skill = Skill.objects.create(owner=user, name=f"Skill {index}", weekly_goal_minutes=entry["goal"], is_active=entry["active"])
+        created = datetime.combine(today - timedelta(days=entry["age"]), time(12), tzinfo=dt_timezone.utc)
+        Skill.objects.filter(pk=skill.pk).update(created_at=created)
+        skills.append(skill)
+    for day in spec["days"]:
+        checkin, _created = DailyCheckin.objects.get_or_create(owner=user, date=today - timedelta(days=day["offset"]))
+        for entry in day["sessions"]:
+            MITSession.objects.create(
+                daily_checkin=checkin,
+                skill=None if entry["skill"] < 0 else _pick(skills, entry["skill"]),
+                status=entry["status"],
+                planned_minutes=entry["planned"],
+                actual_minutes=entry["actual"],
+            )
+    return user, today
+
+
+@contextmanager
+def isolated_environment():
+    """A throwaway test database, a private in-process cache and a temporary archive directory.
+
+    Generated histories commit for real (cache invalidation only fires on
+    commit), so they must never touch the configured database or the shared
+    cache, where their primary keys would collide with real users'.
+    """
+    from django.test.utils import setup_databases, teardown_databases
+
+    with tempfile.TemporaryDirectory() as archive_root, override_settings(CACHES=ISOLATED_CACHES, SESSION_ARCHIVE_ROOT=archive_root):
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            yield
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+
+def check_history(spec):
+    """Build ``spec`` for a new user, audit it before and after its operations, then delete the user.
+
+    Call inside ``isolated_environment`` or a test case. The cached dashboard
+    is audited before the operations too, so stale entries that survive them
+    are caught.
+    """
+    mismatches = []
+    with tempfile.TemporaryDirectory() as archive_root, override_settings(SESSION_ARCHIVE_ROOT=archive_root):
+        user, today = _load_history(spec)
+        try:
+            periods = Periods(timezone="UTC", today=today)
+            mismatches += [f"[initial] {m}" for m in audit_user(user, periods)]
+            for operation in spec["operations"]:
+                _apply_operation(user, today, operation)
+            mismatches += [f"[after operations] {m}" for m in audit_user(user, periods)]
+            earlier = Periods(timezone="UTC", today=today - timedelta(days=spec["recheck"]))
+            mismatches += [f"[{earlier.today}] {m}" for m in audit_user(user, earlier)]
+        finally:
+            user.delete()
+    return mismatches
+
+
+def run_generated(examples, seed):
+    """Check ``examples`` randomized histories; returns ``(checked, failures)``.
+
+    Call inside ``isolated_environment`` or a test case, like ``check_history``.
+
+    With Hypothesis installed, histories come from ``history_strategy`` and a
+    failure is shrunk to a minimal spec; otherwise from ``random.Random(seed)``.
+    Each failure is ``(spec, mismatches)``.
+    """
+    try:
+        import hypothesis
+    except ImportError:
+        hypothesis = None
+
+    if hypothesis is None:
+        rng = random.Random(seed)
+        failures = []
+        for _ in range(examples):
+            spec = random_history(rng)
+            mismatches = check_history(spec)
+            if mismatches:
+                failures.append((spec, mismatches))
+        return examples, failures
+
+    checked, last_failure = 0, []
+
+    @hypothesis.seed(seed)
+    @hypothesis.settings(max_examples=examples, deadline=None, database=None, suppress_health_check=list(hypothesis.HealthCheck))
+    @hypothesis.given(history_strategy())
+    def run(spec):
+        nonlocal checked
+        checked += 1
+        mismatches = check_history(spec)
+        if mismatches:
+            last_failure[:] = [(spec, mismatches)]
+            raise AssertionError(mismatches[0])
+
+    try:
+        run()
+    except AssertionError:
+        # Hypothesis replays the shrunk example last, so this is the minimal one.
+        return checked, last_failure
+    return checked, []
@@ -0,0 +1,255 @@
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+from django.utils.functional import cached_property
+
+from . import forecast
+from .cache import current_version
+from .models import DailyCheckin, MITSession
+from .periods import resolve_periods
+
+COMPLETED = MITSession.Status.COMPLETED
+CACHE_TIMEOUT = 60 * 60 * 24 * 35
+
+
+def _is_checkin_completed(checkin):
+    mits = list(checkin.mits.all())
+    return len(mits) >= 1 and all(m.status == COMPLETED for m in mits)
+
+
+def current_streak(user, today=None):
+    checkins = DailyCheckin.objects.filter(owner=user).prefetch_related("mits").order_by("-date")
+    if not checkins.exists():
+        return 0
+
+    streak = 0
+    expected_date = today or date.today()
+    checkin_map = {c.date: c for c in checkins}
+    archived_days = None
+    while True:
+        checkin = checkin_map.get(expected_date)
+        if not checkin:
+            break
+        if checkin.mits.all():
+            if not _is_checkin_completed(checkin):
+                break
+        else:
+            # Check-ins whose sessions were archived keep their row but no live MITs.
+            if archived_days is None:
+                from . import archive
+
+                archived_days = archive.completed_days(user, before=expected_date + timedelta(days=1))
+            if not archived_days.get(expected_date):
+                break
+        streak += 1
+        expected_date = expected_date - timedelta(days=1)
+    return streak
+
+
+def _rate(part, whole):
+    return round((part / whole) * 100, 1) if whole else 0
+
+
+def _sum_or_none(values):
+    values = [v for v in values if v is not None]
+    return sum(values) if values else None
+
+
+class DashboardData:
+    """Everything the home dashboard shows for one user and one day.
+
+    The week's and month's sessions are each fetched once; every widget is
+    derived from those rows in memory, so templates and JSON callers share
+    the same numbers without re-querying. Aggregates are cached under the
+    user's period keys (see ``core.periods``), so they roll over at the
+    user's own midnight and are invalidated by ``bump_cache_version``.
+    """
+
+    def __init__(self, user, periods=None, use_cache=True):
+        self.user = user
+        self.periods = periods or resolve_periods(user)
+        self.today = self.periods.today
+        self.week_start = self.periods.week_start
+        self.week_end = self.periods.week_end
+        self.use_cache = use_cache
+
+    @cached_property
+    def _cache_version(self):
+        return current_version(self.user.pk)
+
+    def _cached(self, name, period_key, compute):
+        if not self.use_cache:
+            return compute()
+        key = f"dashboard:{self.user.pk}:{self._cache_version}:{name}:{period_key}"
+        return cache.get_or_set(key, compute, CACHE_TIMEOUT)
+
+    @cached_property
+    def week_sessions(self):
+        return list(
+            MITSession.objects.select_related("daily_checkin", "skill").filter(
+                daily_checkin__owner=self.user,
+                daily_checkin__date__range=(self.week_start, self.week_end),
+            )
+        )
+
+    @cached_property
+    def month_sessions(self):
+        return list(
+            MITSession.objects.filter(
+                daily_checkin__owner=self.user,
+                daily_checkin__date__year=self.today.year,
+                daily_checkin__date__month=self.today.month,
+            ).values("status", "actual_minutes", "skill__name")
+        )
+
+    @cached_property
+    def summary(self):
+        return self._cached("summary", self.periods.week_key, self._summary)
+
+    def _summary(self):
+        completed = [s for s in self.week_sessions if s.status == COMPLETED]
+        return {
+            "total": len(self.week_sessions),
+            "completed": len(completed),
+            "actual_minutes": _sum_or_none(s.actual_minutes for s in completed),
+        }
+
+    @property
+    def completion_rate(self):
+        return _rate(self.summary["completed"], self.summary["total"])
+
+    @cached_property
+    def monthly_completion_rate(self):
+        return self._cached("monthly_completion_rate", self.periods.month_key, self._monthly_completion_rate)
+
+    def _monthly_completion_rate(self):
+        completed = sum(1 for s in self.month_sessions if s["status"] == COMPLETED)
+        return _rate(completed, len(self.month_sessions))
+
+    @cached_property
+    def current_streak(self):
+        return self._cached("current_streak", self.periods.day_key, lambda: current_streak(self.user, self.today))
+
+    @cached_property
+    def recent_mits(self):
+        return list(
+            MITSession.objects.select_related("daily_checkin", "skill")
+            .filter(daily_checkin__owner=self.user, status=COMPLETED)
+            .order_by("-daily_checkin__date", "skill__name")[:9]
+        )
+
+    @cached_property
+    def daily_trend(self):
+        return self._cached("daily_trend", self.periods.week_key, self._daily_trend)
+
+    def _daily_trend(self):
+        daily_map = defaultdict(int)
+        for s in self.week_sessions:
+            daily_map[s.daily_checkin.date] += s.actual_minutes or 0
+        days = [self.week_start + timedelta(days=offset) for offset in range(7)]
+        return [day.strftime("%a %d") for day in days], [daily_map.get(day, 0) for day in days]
+
+    @cached_property
+    def monthly_trend(self):
+        return self._cached("monthly_trend", self.periods.month_key, self._monthly_trend)
+
+    def _monthly_trend(self):
+        monthly_trend_qs = (
+            MITSession.objects.filter(daily_checkin__owner=self.user, status=COMPLETED)
+            .annotate(month=TruncMonth("daily_checkin__date"))
+            .values("month")
+            .annotate(actual=Sum("actual_minutes"))
+            .order_by("month")
+        )
+        # Imported here so the archive reader loads on the first uncached trend, not at worker boot.
+        from . import archive
+
+        month_totals = archive.monthly_completed_minutes(self.user)
+        for r in monthly_trend_qs:
+            month_totals[r["month"]] = month_totals.get(r["month"], 0) + (r["actual"] or 0)
+        months = sorted(month_totals)
+        return [m.strftime("%b %Y") for m in months], [month_totals[m] for m in months]
+
+    @cached_property
+    def category_mix(self):
+        return self._cached("category_mix", self.periods.week_key, self._category_mix)
+
+    def _category_mix(self):
+        counts = defaultdict(int)
+        for s in self.week_sessions:
+            if s.status == COMPLETED:
+                counts[s.skill.name if s.skill else None] += 1
+        ranked = sorted(counts.items(), key=lambda item: -item[1])
+        return [name or "(No category)" for name, _count in ranked], [count for _name, count in ranked]
+
+    @cached_property
+    def goal_progress(self):
+        # Pacing depends on how much of the week is left, so this rolls over daily.
+        return self._cached("goal_progress", self.periods.day_key, lambda: forecast.goal_pacing(self.user, self.periods))
+
+    @cached_property
+    def incomplete_sessions(self):
+        if "week_sessions" in self.__dict__:
+            pending = [s for s in self.week_sessions if s.status != COMPLETED]
+        else:
+            # Cached aggregates skipped the week fetch; load only the open rows.
+            pending = list(
+                MITSession.objects.select_related("daily_checkin", "skill")
+                .filter(daily_checkin__owner=self.user, daily_checkin__date__range=(self.week_start, self.week_end))
+                .exclude(status=COMPLETED)
+            )
+        return sorted(pending, key=lambda s: (-s.daily_checkin.date.toordinal(), s.pk))
+
+    @cached_property
+    def monthly_narrative(self):
+        return self._cached("monthly_narrative", self.periods.month_key, self._monthly_narrative)
+
+    def _monthly_narrative(self):
+        completed_sessions = [s for s in self.month_sessions if s["status"] == COMPLETED]
+        if not completed_sessions:
+            return "No Focused sessions logged this month yet. Start with one focused check-in today."
+
+        skill_minutes = defaultdict(list)
+        for s in completed_sessions:
+            skill_minutes[s["skill__name"]].append(s["actual_minutes"])
+        ranked = sorted(((name, _sum_or_none(values)) for name, values in skill_minutes.items()), key=lambda item: -(item[1] or 0))
+        top = next(((name, actual) for name, actual in ranked if name and (actual or 0) > 0), None)
+        lead = f"Top focus so far: {top[0]} ({top[1]} min)." if top else "You have planned MITs logged, but actual minutes are still sparse."
+
+        rate = self.monthly_completion_rate
+        if rate >= 80:
+            tone = "Strong consistency this month. Keep the same cadence."
+        elif rate >= 60:
+            tone = "Good momentum. Tighten follow-through on skipped Focused Sessions."
+        else:
+            tone = "Execution is below target. Simplify tomorrow’s first Focused session and protect the first block."
+
+        return f"{lead} {tone}"
+
+    @property
+    def week_range_label(self):
+        return f"{self.week_start:%b %d} – {self.week_end:%b %d}"
+
+    def context(self):
+        trend_labels, trend_actual = self.daily_trend
+        month_labels, month_actual = self.monthly_trend
+        category_labels, category_data = self.category_mix
+        return {
+            "summary": self.summary,
+            "recent_mits": self.recent_mits,
+            "completion_rate": self.completion_rate,
+            "current_streak": self.current_streak,
+            "trend_labels": trend_labels,
+            "trend_actual": trend_actual,
+            "category_labels": category_labels,
+            "category_data": category_data,
+            "month_labels": month_labels,
+            "month_actual": month_actual,
+            "monthly_narrative": self.monthly_narrative,
+            "goal_progress": self.goal_progress,
+            "week_range_label": self.week_range_label,
+            "incomplete_sessions": self.incomplete_sessions,
+        }
@@ -0,0 +1,269 @@
+import csv
+import json
+import logging
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import archive
+from .models import MITSession, ReportExport, SessionArchive
+
+logger = logging.getLogger(__name__)
+
+# Column schema shared by the synchronous CSV download and background exports.
+CSV_HEADER = ["Date", "Focus Category", "Task", "Planned Minutes", "Actual Minutes", "Status", "Miss Reason"]
+FIELDS = ["date", "focus_category", "task", "planned_minutes", "actual_minutes", "status", "miss_reason"]
+STATUS_LABELS = dict(MITSession.Status.choices)
+CHUNK_SIZE = 5000
+
+SESSION_VALUES = ("daily_checkin__date", "skill__name", "title", "planned_minutes", "actual_minutes", "status", "miss_reason", "daily_checkin__owner__username")
+
+_executor = None
+
+
+def session_row(values):
+    """Schema-ordered tuple from a ``SESSION_VALUES`` values_list row (owner last)."""
+    day, skill_name, title, planned, actual, status, miss_reason, owner = values
+    return (day, skill_name or "", title, planned, actual, STATUS_LABELS[status], miss_reason, owner)
+
+
+def archived_row(row, owner):
+    return (row["date"], row["skill_name"] or "", row["title"], row["planned_minutes"], row["actual_minutes"], STATUS_LABELS[row["status"]], row["miss_reason"], owner)
+
+
+def csv_values(row):
+    day, skill_name, title, planned, actual, status, miss_reason = row[:7]
+    return [day, skill_name, title, planned, actual or "", status, miss_reason]
+
+
+def iter_rows(owner=None, year=None, month=None):
+    """Yield schema rows newest first: live sessions, then archived ones.
+
+    ``owner=None`` exports every user. Live rows are fetched in keyset-paged
+    chunks, each its own short query, so no read cursor stays open between
+    chunks to block writers; archives are read one file at a time, so memory
+    stays bounded.
+    """
+    sessions = MITSession.objects.filter(daily_checkin__owner__isnull=False)
+    archives = SessionArchive.objects.select_related("owner").order_by("-year", "owner_id")
+    if owner is not None:
+        sessions = sessions.filter(daily_checkin__owner=owner)
+        archives = archives.filter(owner=owner)
+    if year is not None:
+        sessions = sessions.filter(daily_checkin__date__year=year, daily_checkin__date__month=month)
+        archives = archives.filter(year=year)
+    sessions = sessions.order_by("-daily_checkin__date", "pk").values_list("pk", *SESSION_VALUES)
+    page = sessions
+    while True:
+        chunk = list(page[:CHUNK_SIZE])
+        for values in chunk:
+            yield session_row(values[1:])
+        if len(chunk) < CHUNK_SIZE:
+            break
+        last_pk, last_day = chunk[-1][0], chunk[-1][1]
+        page = sessions.filter(Q(daily_checkin__date__lt=last_day) | Q(daily_checkin__date=last_day, pk__gt=last_pk))
+    for entry in archives:
+        rows = archive.archived_rows(entry.owner, year=entry.year, month=month)
+        for row in sorted(rows, key=lambda r: r["date"], reverse=True):
+            yield archived_row(row, entry.owner.username)
+
+
+def _chunks(rows, size=CHUNK_SIZE):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class CSVWriter:
+    def __init__(self, path, include_owner):
+        self.fh = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.fh)
+        self.include_owner = include_owner
+        self.writer.writerow((["User"] if include_owner else []) + CSV_HEADER)
+
+    def write(self, chunk):
+        self.writer.writerows(([row[7]] if self.include_owner else []) + csv_values(row) for row in chunk)
+
+    def close(self):
+        self.fh.close()
+
+
+class JSONLWriter:
+    def __init__(self, path, include_owner):
+        self.fh = open(path, "w", encoding="utf-8")
+        self.include_owner = include_owner
+
+    def write(self, chunk):
+        for row in chunk:
+            record = dict(zip(FIELDS, row[:7]))
+            record["date"] = record["date"].isoformat()
+            if self.include_owner:
+                record["user"] = row[7]
+            self.fh.write(json.dumps(record) + "\n")
+
+    def close(self):
+        self.fh.close()
+
+
+class ParquetWriter:
+    def __init__(self, path, include_owner):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet exports need the optional pyarrow package.")
+        self.pa = pa
+        self.include_owner = include_owner
+        fields = [
+            ("date", pa.date32()),
+            ("focus_category", pa.string()),
+            ("task", pa.string()),
+            ("planned_minutes", pa.int32()),
+            ("actual_minutes", pa.int32()),
+            ("status", pa.string()),
+            ("miss_reason", pa.string()),
+        ]
+        if include_owner:
+            fields.insert(0, ("user", pa.string()))
+        self.schema = pa.schema(fields)
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, chunk):
+        columns = {name: [row[i] for row in chunk] for i, name in enumerate(FIELDS)}
+        if self.include_owner:
+            columns["user"] = [row[7] for row in chunk]
+        self.writer.write_table(self.pa.Table.from_pydict(columns, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+WRITERS = {
+    ReportExport.Format.CSV: CSVWriter,
+    ReportExport.Format.JSONL: JSONLWriter,
+    ReportExport.Format.PARQUET: ParquetWriter,
+}
+
+
+def export_root():
+    return Path(getattr(settings, "EXPORT_ROOT", Path(settings.BASE_DIR) / "exports"))
+
+
+def _retention():
+    return timedelta(hours=getattr(settings, "EXPORT_TTL_HOURS", 24))
+
+
+def _fail(export, error, now=None):
+    now = now or timezone.now()
+    if export.file_name:
+        (export_root() / export.file_name).unlink(missing_ok=True)
+    export.status = ReportExport.Status.FAILED
+    export.error = error
+    export.finished_at = now
+    # Failed rows age out like finished ones, so purge_expired clears them too.
+    export.expires_at = now + _retention()
+    export.save(update_fields=["status", "error", "finished_at", "expires_at"])
+
+
+def run_export(export_id):
+    """Generate one export file; safe to call from a worker thread or a management command."""
+    try:
+        export = ReportExport.objects.select_related("owner").get(pk=export_id)
+        if export.status != ReportExport.Status.PENDING:
+            return
+        # Claimed with a conditional UPDATE: SQLite ignores SELECT ... FOR UPDATE,
+        # so only the worker whose update still matches the PENDING row goes on.
+        # The file name is recorded up front, so a partial file left by a killed
+        # worker can be found and removed.
+        export.status = ReportExport.Status.RUNNING
+        export.started_at = timezone.now()
+        export.file_name = f"{export.pk}-{secrets.token_hex(8)}.{export.format}"
+        claimed = ReportExport.objects.filter(pk=export.pk, status=ReportExport.Status.PENDING).update(
+            status=export.status, started_at=export.started_at, file_name=export.file_name
+        )
+        if not claimed:
+            return
+
+        year, month = (int(part) for part in export.month.split("-")) if export.month else (None, None)
+        export_root().mkdir(parents=True, exist_ok=True)
+        path = export_root() / export.file_name
+        try:
+            writer = WRITERS[export.format](path, include_owner=export.all_users)
+            row_count = 0
+            try:
+                for chunk in _chunks(iter_rows(None if export.all_users else export.owner, year, month)):
+                    writer.write(chunk)
+                    row_count += len(chunk)
+            finally:
+                writer.close()
+        except Exception as exc:
+            logger.exception("Export %s failed", export.pk)
+            _fail(export, str(exc))
+            return
+
+        now = timezone.now()
+        # Finish only a job that is still RUNNING: one fail_stalled failed while
+        # this worker ran stays FAILED, and the file it no longer owns is removed.
+        finished = ReportExport.objects.filter(pk=export.pk, status=ReportExport.Status.RUNNING).update(
+            status=ReportExport.Status.READY, row_count=row_count, finished_at=now, expires_at=now + _retention()
+        )
+        if not finished:
+            path.unlink(missing_ok=True)
+    finally:
+        close_old_connections()
+
+
+def fail_stalled(now=None):
+    """Fail RUNNING exports older than ``EXPORT_STALL_MINUTES``: their worker died (e.g. a deploy restart).
+
+    Their partial files are deleted; returns how many were failed.
+    """
+    now = now or timezone.now()
+    cutoff = now - timedelta(minutes=getattr(settings, "EXPORT_STALL_MINUTES", 30))
+    stalled = ReportExport.objects.filter(status=ReportExport.Status.RUNNING, started_at__lt=cutoff)
+    count = 0
+    for export in stalled.iterator():
+        _fail(export, "The export was interrupted before it finished. Please request it again.", now)
+        count += 1
+    return count
+
+
+def enqueue(export):
+    """Hand ``export`` to the in-process worker pool once the creating transaction commits."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=getattr(settings, "EXPORT_WORKERS", 2), thread_name_prefix="export")
+    transaction.on_commit(lambda: _executor.submit(run_export, export.pk))
+
+
+def purge_expired(now=None):
+    """Delete expired READY and FAILED exports with their files, plus stray files no export owns."""
+    now = now or timezone.now()
+    expired = ReportExport.objects.filter(expires_at__lt=now)
+    count = 0
+    for export in expired.iterator():
+        if export.file_name:
+            (export_root() / export.file_name).unlink(missing_ok=True)
+        count += 1
+    expired.delete()
+
+    # Files from workers killed before their name was recorded; old enough that no export is still writing them.
+    root = export_root()
+    if root.is_dir():
+        known = set(ReportExport.objects.exclude(file_name="").values_list("file_name", flat=True))
+        cutoff = (now - _retention()).timestamp()
+        for path in root.iterdir():
+            if path.is_file() and path.name not in known and path.stat().st_mtime < cutoff:
+                path.unlink(missing_ok=True)
+    return count
@@ -0,0 +1,59 @@
+import math
+from datetime import timedelta
+
+from .models import Skill, WeeklySkillTotal
+from .rollup import week_of
+
+DEFAULT_HISTORY_WEEKS = 8
+MAX_HISTORY_WEEKS = 52
+
+
+def _rate(part, whole):
+    return round((part / whole) * 100, 1) if whole else 0
+
+
+def goal_pacing(user, periods, weeks=DEFAULT_HISTORY_WEEKS):
+    """Per-skill progress and pacing for the current week, from the weekly rollup.
+
+    Two queries regardless of history length: the active skills, and their
+    ``WeeklySkillTotal`` rows for this week and the ``weeks`` before it.
+    ``projected`` extrapolates the pace so far (today counts as elapsed);
+    ``needed_per_day`` spreads what is left over today and the rest of the week;
+    ``hit_rate`` is the share of past weeks, since the skill existed, that met
+    today's goal.
+    """
+    week_start = periods.week_start
+    first_week = week_start - timedelta(weeks=weeks)
+    skills = list(Skill.objects.filter(owner=user, is_active=True).order_by("name"))
+    totals = {
+        (t.skill_id, t.week_start): t.completed_minutes
+        for t in WeeklySkillTotal.objects.filter(skill__in=skills, week_start__range=(first_week, week_start))
+    }
+
+    days_elapsed = (periods.today - week_start).days + 1
+    days_left = 8 - days_elapsed
+    pacing = []
+    for skill in skills:
+        goal = skill.weekly_goal_minutes or 0
+        actual = totals.get((skill.pk, week_start), 0)
+        projected = round(actual / days_elapsed * 7)
+        remaining = max(goal - actual, 0)
+        since = max(first_week, week_of(skill.created_at.date()))
+        past_weeks = [since + timedelta(weeks=i) for i in range((week_start - since).days // 7)]
+        weeks_hit = sum(1 for week in past_weeks if goal and totals.get((skill.pk, week), 0) >= goal)
+        pacing.append({
+            "skill_id": skill.pk,
+            "name": skill.name,
+            "goal": goal,
+            "actual": actual,
+            "pct": _rate(actual, goal),
+            "projected": projected,
+            "on_pace": projected >= goal,
+            "remaining": remaining,
+            "days_left": days_left,
+            "needed_per_day": math.ceil(remaining / days_left),
+            "weeks_considered": len(past_weeks),
+            "weeks_hit": weeks_hit,
+            "hit_rate": _rate(weeks_hit, len(past_weeks)) if goal and past_weeks else None,
+        })
+    return pacing
@@ -1,9 +1,12 @@
+from zoneinfo import available_timezones
+
 from django import forms
+from django.conf import settings
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
 from django.forms import BaseInlineFormSet, inlineformset_factory
 
-from .models import DailyCheckin, MITSession, Skill
+from .models import DailyCheckin, MITSession, Skill, UserPreference
 
 
 class SignUpForm(UserCreationForm):
@@ -42,6 +45,32 @@ class FocusCategoryForm(forms.ModelForm):
         }
 
 
+class UserPreferenceForm(forms.ModelForm):
+    timezone = forms.ChoiceField(required=False, widget=forms.Select(attrs={"class": "form-select"}))
+
+    class Meta:
+        model = UserPreference
+        fields = ["timezone", "reminders_enabled", "remind_missing_checkin", "remind_open_sessions", "reminder_hour"]
+        labels = {
+            "reminders_enabled": "Email me reminders",
+            "remind_missing_checkin": "When I haven't logged a check-in today",
+            "remind_open_sessions": "When this week's focus sessions are still open",
+            "reminder_hour": "Send at (your local time)",
+        }
+        widgets = {
+            "reminders_enabled": forms.CheckboxInput(attrs={"class": "form-check-input"}),
+            "remind_missing_checkin": forms.CheckboxInput(attrs={"class": "form-check-input"}),
+            "remind_open_sessions": forms.CheckboxInput(attrs={"class": "form-check-input"}),
+            "reminder_hour": forms.Select(attrs={"class": "form-select w-auto"}),
+        }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["timezone"].choices = [("", f"Server default ({settings.TIME_ZONE})")] + [(name, name) for name in sorted(available_timezones())]
+        self.fields["timezone"].label = "Time zone"
+        self.fields["timezone"].help_text = "Decides when your day, week and month roll over."
+
+
 class MITSessionForm(forms.ModelForm):
     completed = forms.BooleanField(label="Completed", required=False, widget=forms.CheckboxInput(attrs={"class": "form-check-input"}))
 
@@ -0,0 +1,33 @@
+from datetime import date, datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.archive import archive_sessions
+
+
+class Command(BaseCommand):
+    help = "Move focus sessions older than a cutoff into per-user, per-year columnar archive files."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than-days", type=int, default=365, help="Archive sessions dated more than this many days ago (default: 365).")
+        parser.add_argument("--before", help="Explicit cutoff date (YYYY-MM-DD); overrides --older-than-days.")
+        parser.add_argument("--user", help="Only archive this username's sessions.")
+
+    def handle(self, *args, **options):
+        if options["before"]:
+            try:
+                cutoff = datetime.strptime(options["before"], "%Y-%m-%d").date()
+            except ValueError:
+                raise CommandError("--before must be a date in YYYY-MM-DD format.")
+        else:
+            cutoff = date.today() - timedelta(days=options["older_than_days"])
+
+        owner = None
+        if options["user"]:
+            owner = get_user_model().objects.filter(username=options["user"]).first()
+            if owner is None:
+                raise CommandError(f"No user named {options['user']!r}.")
+
+        count = archive_sessions(cutoff, owner=owner)
+        self.stdout.write(self.style.SUCCESS(f"Archived {count} session(s) dated before {cutoff}."))
@@ -0,0 +1,107 @@
+import random
+import time
+from datetime import date, timedelta
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, reset_queries, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from core import search
+from core.models import DailyCheckin, MITSession, Skill
+
+BENCH_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "bench-admin"}}
+
+CHANGELISTS = [
+    ("sessions", MITSession, ""),
+    ("sessions ?status=completed", MITSession, "?status=completed"),
+    ("sessions ?owner=<user>", MITSession, "?owner={username}"),
+    ("sessions ?q=sketch", MITSession, "?q=sketch"),
+    ("check-ins", DailyCheckin, ""),
+    ("check-ins ?owner=<user>", DailyCheckin, "?owner={username}"),
+]
+
+
+class Command(BaseCommand):
+    help = "Seed a throwaway dataset and time admin changelist renders. Everything is rolled back afterwards."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sessions", type=int, default=1_000_000)
+        parser.add_argument("--users", type=int, default=2000)
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=7)
+
+    def handle(self, *args, **options):
+        # Admin modules are discovered lazily (see mit_dashboard/admin_urls.py).
+        admin.autodiscover()
+        # A private cache, so row counts of the rolled-back data never reach the real admin.
+        with override_settings(CACHES=BENCH_CACHES), transaction.atomic():
+            sample_user = self._seed(options["sessions"], options["users"], random.Random(options["seed"]))
+            superuser = get_user_model().objects.create_superuser("bench-admin", "bench@example.com", "bench")
+            factory = RequestFactory()
+            self.stdout.write(f"{'changelist':32} {'best ms':>9} {'queries':>8}")
+            for label, model, query in CHANGELISTS:
+                model_admin = admin.site._registry[model]
+                url = f"/admin/core/{model._meta.model_name}/" + query.format(username=sample_user.username)
+                best, queries = None, 0
+                for _ in range(options["repeat"]):
+                    request = factory.get(url)
+                    request.user = superuser
+                    reset_queries()
+                    with CaptureQueriesContext(connection) as captured:
+                        started = time.perf_counter()
+                        response = model_admin.changelist_view(request)
+                        if hasattr(response, "render"):
+                            response.render()
+                        elapsed = (time.perf_counter() - started) * 1000
+                    best = elapsed if best is None else min(best, elapsed)
+                    queries = len(captured)
+                self.stdout.write(f"{label:32} {best:9.1f} {queries:8d}")
+            transaction.set_rollback(True)
+
+    def _seed(self, session_count, user_count, rnd):
+        User = get_user_model()
+        self.stdout.write(f"Seeding {user_count} users and {session_count} sessions (rolled back afterwards)...")
+        users = User.objects.bulk_create([User(username=f"bench-user-{i}") for i in range(user_count)])
+        skills = Skill.objects.bulk_create([Skill(owner=u, name=name) for u in users for name in ("Deep Work", "Reading", "Sketching")])
+        skills_by_owner = {}
+        for skill in skills:
+            skills_by_owner.setdefault(skill.owner_id, []).append(skill)
+
+        per_user = max(1, session_count // user_count)
+        days_per_user = max(1, per_user // 3)
+        start = date.today() - timedelta(days=days_per_user)
+        checkins = DailyCheckin.objects.bulk_create(
+            [DailyCheckin(owner=u, date=start + timedelta(days=d)) for u in users for d in range(days_per_user)],
+            batch_size=5000,
+        )
+
+        created, batch = 0, []
+        statuses = [MITSession.Status.COMPLETED, MITSession.Status.COMPLETED, MITSession.Status.PLANNED, MITSession.Status.SKIPPED]
+        while created < session_count:
+            for checkin in checkins:
+                if created >= session_count:
+                    break
+                status = rnd.choice(statuses)
+                minutes = rnd.randint(10, 90)
+                batch.append(MITSession(
+                    daily_checkin=checkin,
+                    skill=rnd.choice(skills_by_owner[checkin.owner_id]),
+                    title=rnd.choice(["Deep work block", "Sketch practice", "Reading notes"]),
+                    planned_minutes=minutes,
+                    actual_minutes=minutes if status == MITSession.Status.COMPLETED else None,
+                    status=status,
+                ))
+                created += 1
+                if len(batch) == 5000:
+                    self._create_sessions(batch)
+                    batch = []
+        self._create_sessions(batch)
+        return users[0]
+
+    def _create_sessions(self, batch):
+        # bulk_create skips the signals that feed the search index, so ?q= would match nothing.
+        MITSession.objects.bulk_create(batch)
+        search.index_sessions(batch)
@@ -0,0 +1,77 @@
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, reset_queries, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from core.models import DailyCheckin, MITSession, Skill
+
+WRITE_VERBS = ("INSERT", "UPDATE", "DELETE")
+
+
+def _post_data(day, sessions, notes=""):
+    """Form payload for ``checkin_create``: ``sessions`` is a list of (id, skill_id, minutes, completed)."""
+    initial = sum(1 for pk, *_rest in sessions if pk)
+    data = {
+        "date": day.isoformat(),
+        "notes": notes,
+        "mits-TOTAL_FORMS": str(len(sessions) + 1),
+        "mits-INITIAL_FORMS": str(initial),
+        "mits-MIN_NUM_FORMS": "1",
+        "mits-MAX_NUM_FORMS": "8",
+    }
+    for i, (pk, skill_id, minutes, completed) in enumerate(sessions):
+        data[f"mits-{i}-id"] = str(pk or "")
+        data[f"mits-{i}-skill"] = str(skill_id)
+        data[f"mits-{i}-actual_minutes"] = str(minutes)
+        if completed:
+            data[f"mits-{i}-completed"] = "on"
+    return data
+
+
+class Command(BaseCommand):
+    help = "Time check-in form saves and count the database writes each one issues. Everything is rolled back afterwards."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        # The test client sends Host: testserver, which production ALLOWED_HOSTS rejects.
+        with override_settings(RATE_LIMITS={}, ALLOWED_HOSTS=["testserver"]), transaction.atomic():
+            user = get_user_model().objects.create_user("bench-checkin", password="bench")
+            skills = Skill.objects.bulk_create([Skill(owner=user, name=name) for name in ("Deep Work", "Reading", "Sketching")])
+            client = Client()
+            client.force_login(user)
+            day = date.today()
+            self._save(client, _post_data(day, [(None, s.pk, 30, True) for s in skills], notes="Bench day"))
+            checkin = DailyCheckin.objects.get(owner=user, date=day)
+            existing = [(m.pk, m.skill_id, m.planned_minutes, m.status == MITSession.Status.COMPLETED) for m in checkin.mits.order_by("pk")]
+
+            scenarios = [
+                ("unchanged resubmit", lambda i: _post_data(day, existing, notes="Bench day")),
+                ("one session edited", lambda i: _post_data(day, [(existing[0][0], existing[0][1], 31 + i % 2, True)] + existing[1:], notes="Bench day")),
+                ("new day, 3 sessions", lambda i: _post_data(day - timedelta(days=i + 1), [(None, s.pk, 30, True) for s in skills])),
+            ]
+            self.stdout.write(f"{'scenario':24} {'best ms':>9} {'queries':>8} {'writes':>7}")
+            for label, payload in scenarios:
+                best, queries, writes = None, 0, 0
+                for i in range(options["repeat"]):
+                    elapsed, queries, writes = self._save(client, payload(i))
+                    best = elapsed if best is None else min(best, elapsed)
+                self.stdout.write(f"{label:24} {best:9.1f} {queries:8d} {writes:7d}")
+            transaction.set_rollback(True)
+
+    def _save(self, client, data):
+        reset_queries()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = client.post("/checkins/new/", data)
+            elapsed = (time.perf_counter() - started) * 1000
+        if response.status_code != 302:
+            raise RuntimeError(f"Check-in save was rejected ({response.status_code}).")
+        # Session-table writes are login bookkeeping, not the save path.
+        writes = [q for q in captured if q["sql"].lstrip().upper().startswith(WRITE_VERBS) and "django_session" not in q["sql"]]
+        return elapsed, len(captured), len(writes)
@@ -0,0 +1,87 @@
+import random
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, reset_queries, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from core.models import DailyCheckin, MITSession, Skill, Team, TeamMembership
+
+BENCH_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "bench-team"}}
+
+
+class Command(BaseCommand):
+    help = "Seed a throwaway team with history and time its dashboard pages. Everything is rolled back afterwards."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--members", type=int, default=500)
+        parser.add_argument("--days", type=int, default=365, help="Days of history per member (3 sessions a day).")
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=7)
+
+    def handle(self, *args, **options):
+        # The test client sends Host: testserver, which production ALLOWED_HOSTS rejects. A private cache keeps
+        # dashboard aggregates of the rolled-back data out of the real one.
+        with override_settings(CACHES=BENCH_CACHES, ALLOWED_HOSTS=["testserver"]), transaction.atomic():
+            team, manager, member = self._seed(options["members"], options["days"], random.Random(options["seed"]))
+            pages = [
+                ("team, week (manager)", manager, reverse("team_dashboard", args=[team.slug])),
+                ("team, month (manager)", manager, reverse("team_dashboard", args=[team.slug]) + "?scope=month"),
+                ("team, week (member)", member, reverse("team_dashboard", args=[team.slug])),
+                ("member drill-down", manager, reverse("team_member", args=[team.slug, member.username])),
+            ]
+            # The drill-down caches its aggregates, so "first" is the cold render and "best" a warm one.
+            self.stdout.write(f"{'page':24} {'first ms':>9} {'best ms':>9} {'queries':>8}")
+            for label, viewer, url in pages:
+                client = Client()
+                client.force_login(viewer)
+                timings, queries = [], 0
+                for _ in range(options["repeat"]):
+                    reset_queries()
+                    with CaptureQueriesContext(connection) as captured:
+                        started = time.perf_counter()
+                        response = client.get(url)
+                        elapsed = (time.perf_counter() - started) * 1000
+                    if response.status_code != 200:
+                        raise RuntimeError(f"{url} returned {response.status_code}")
+                    timings.append(elapsed)
+                    queries = len(captured)
+                self.stdout.write(f"{label:24} {timings[0]:9.1f} {min(timings):9.1f} {queries:8d}")
+            transaction.set_rollback(True)
+
+    def _seed(self, member_count, days, rnd):
+        User = get_user_model()
+        self.stdout.write(f"Seeding a team of {member_count} with {days} days of history each (rolled back afterwards)...")
+        users = User.objects.bulk_create([User(username=f"bench-member-{i}") for i in range(member_count)])
+        team = Team.objects.create(name="Bench team", slug="bench-team")
+        TeamMembership.objects.bulk_create(
+            [TeamMembership(team=team, user=u, role=TeamMembership.Role.MANAGER if i == 0 else TeamMembership.Role.MEMBER) for i, u in enumerate(users)]
+        )
+        skills = Skill.objects.bulk_create([Skill(owner=u, name=name) for u in users for name in ("Deep Work", "Reading", "Sketching")])
+        skills_by_owner = {}
+        for skill in skills:
+            skills_by_owner.setdefault(skill.owner_id, []).append(skill)
+
+        start = date.today() - timedelta(days=days - 1)
+        statuses = [MITSession.Status.COMPLETED, MITSession.Status.COMPLETED, MITSession.Status.PLANNED, MITSession.Status.SKIPPED]
+        for user in users:
+            checkins = DailyCheckin.objects.bulk_create([DailyCheckin(owner=user, date=start + timedelta(days=d)) for d in range(days)])
+            batch = []
+            for checkin in checkins:
+                for skill in skills_by_owner[user.pk]:
+                    status = rnd.choice(statuses)
+                    minutes = rnd.randint(10, 90)
+                    batch.append(MITSession(
+                        daily_checkin=checkin,
+                        skill=skill,
+                        title=skill.name,
+                        planned_minutes=minutes,
+                        actual_minutes=minutes if status == MITSession.Status.COMPLETED else None,
+                        status=status,
+                    ))
+            MITSession.objects.bulk_create(batch, batch_size=5000)
+        return team, users[0], users[-1]
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from core.exports import fail_stalled, purge_expired, run_export
+from core.models import ReportExport
+
+
+class Command(BaseCommand):
+    help = "Generate queued report exports left behind by a restarted worker, fail stalled ones and delete expired files."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--purge-only", action="store_true", help="Only delete expired exports and stray files.")
+
+    def handle(self, *args, **options):
+        if not options["purge_only"]:
+            stalled = fail_stalled()
+            if stalled:
+                self.stdout.write(f"Failed {stalled} stalled export(s).")
+            pending = list(ReportExport.objects.filter(status=ReportExport.Status.PENDING).order_by("created_at").values_list("pk", flat=True))
+            for export_id in pending:
+                run_export(export_id)
+            self.stdout.write(f"Processed {len(pending)} queued export(s).")
+        purged = purge_expired()
+        self.stdout.write(self.style.SUCCESS(f"Removed {purged} expired export(s)."))
@@ -0,0 +1,61 @@
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+PROJECT_PACKAGES = ("core", "mit_dashboard")
+
+
+class Command(BaseCommand):
+    help = "Measure what a fresh worker imports at start-up, like `python -X importtime` but including modules Django loads by name."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--module", default=settings.WSGI_APPLICATION.rsplit(".", 1)[0], help="Module to import (default: the WSGI module).")
+        parser.add_argument("--first-request", action="store_true", help="Also load the URLconf and every view module, as the first request would.")
+        parser.add_argument("--limit", type=int, default=25)
+        parser.add_argument("--sort", choices=("self", "cumulative"), default="self")
+        parser.add_argument("--tree", action="store_true", help="Print every module in import order, indented like -X importtime.")
+        parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters to run; the fastest is reported.")
+
+    def handle(self, *args, **options):
+        runs = [self._run(options["module"], options["first_request"]) for _ in range(max(1, options["repeat"]))]
+        result = min(runs, key=lambda r: r["total_ms"])
+        records = result["records"]
+
+        self.stdout.write(f"{options['module']}: {result['import_ms']:.1f} ms import, {result['total_ms']:.1f} ms total, {len(records)} modules (best of {len(runs)})")
+        if options["tree"]:
+            self.stdout.write(f"{'self us':>9} | {'cumulative':>10} | module")
+            # Modules are listed as they finish, children before their parent, as -X importtime does.
+            for record in records:
+                self.stdout.write(f"{record['self_us']:9d} | {record['cumulative_us']:10d} | {'  ' * record['depth']}{record['module']}")
+            return
+
+        key = "self_us" if options["sort"] == "self" else "cumulative_us"
+        self.stdout.write(f"\n{'self ms':>8} {'cumul ms':>9}  module")
+        for record in sorted(records, key=lambda r: -r[key])[:options["limit"]]:
+            self.stdout.write(f"{record['self_us'] / 1000:8.1f} {record['cumulative_us'] / 1000:9.1f}  {record['module']}")
+
+        by_package = defaultdict(lambda: [0, 0])
+        for record in records:
+            package = record["module"].split(".")[0]
+            if package not in PROJECT_PACKAGES and package != "django":
+                package = "other"
+            by_package[package][0] += record["self_us"]
+            by_package[package][1] += 1
+        self.stdout.write(f"\n{'self ms':>8} {'modules':>8}  package")
+        for package, (self_us, count) in sorted(by_package.items(), key=lambda item: -item[1][0]):
+            self.stdout.write(f"{self_us / 1000:8.1f} {count:8d}  {package}")
+        project = sorted(r["module"] for r in records if r["module"].split(".")[0] in PROJECT_PACKAGES)
+        self.stdout.write(f"\nProject modules loaded: {', '.join(project) or '(none)'}")
+
+    def _run(self, module, first_request):
+        command = [sys.executable, "-m", "core.startup", module] + (["--first-request"] if first_request else [])
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "mit_dashboard.settings")}
+        completed = subprocess.run(command, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+        if completed.returncode:
+            raise CommandError(f"Profiling {module} failed:\n{completed.stderr}")
+        return json.loads(completed.stdout)
@@ -0,0 +1,23 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core import search
+from core.models import SearchEntry
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index for session titles, miss reasons and check-in notes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Only rebuild this username's entries.")
+
+    def handle(self, *args, **options):
+        owner = None
+        if options["user"]:
+            owner = get_user_model().objects.filter(username=options["user"]).first()
+            if owner is None:
+                raise CommandError(f"No user named {options['user']!r}.")
+
+        search.rebuild(owner)
+        entries = SearchEntry.objects.filter(owner=owner) if owner else SearchEntry.objects.all()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {entries.count()} entries."))
@@ -0,0 +1,21 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core import rollup
+
+
+class Command(BaseCommand):
+    help = "Recompute per-skill weekly totals from live sessions and archived years."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Only rebuild this username's totals.")
+
+    def handle(self, *args, **options):
+        owner = None
+        if options["user"]:
+            owner = get_user_model().objects.filter(username=options["user"]).first()
+            if owner is None:
+                raise CommandError(f"No user named {options['user']!r}.")
+
+        weeks = rollup.rebuild(owner)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {weeks} skill-week totals."))
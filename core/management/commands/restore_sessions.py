@@ -0,0 +1,26 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.archive import restore_sessions
+from core.models import SessionArchive
+
+
+class Command(BaseCommand):
+    help = "Restore archived focus sessions back into the live table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", required=True, help="Username whose archive should be restored.")
+        parser.add_argument("--year", type=int, help="Only restore this year (default: every archived year).")
+
+    def handle(self, *args, **options):
+        owner = get_user_model().objects.filter(username=options["user"]).first()
+        if owner is None:
+            raise CommandError(f"No user named {options['user']!r}.")
+
+        years = [options["year"]] if options["year"] else list(SessionArchive.objects.filter(owner=owner).values_list("year", flat=True))
+        total = 0
+        for year in years:
+            count = restore_sessions(owner, year)
+            total += count
+            self.stdout.write(f"{year}: restored {count} session(s).")
+        self.stdout.write(self.style.SUCCESS(f"Restored {total} session(s) for {owner.username}."))
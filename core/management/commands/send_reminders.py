@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.reminders import due_groups, due_reminders, send_due_reminders
+
+
+class Command(BaseCommand):
+    help = "Email users with no check-in today or open focus sessions this week. Safe to re-run: each user gets at most one reminder per day."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", help="Send reminders as of this date, ignoring send hours (YYYY-MM-DD, default: each user's local today once their send hour has passed).")
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--dry-run", action="store_true", help="Only report who would be reminded.")
+
+    def handle(self, *args, **options):
+        today = None
+        if options["date"]:
+            try:
+                today = datetime.strptime(options["date"], "%Y-%m-%d").date()
+            except ValueError:
+                raise CommandError("--date must be a date in YYYY-MM-DD format.")
+
+        if options["dry_run"]:
+            for day, zone, hour in due_groups(today):
+                for user in due_reminders(day, zone, hour):
+                    self.stdout.write(f"{user.username} ({day}): checkin={'yes' if user.has_checkin else 'no'} open_sessions={user.open_sessions}")
+
+        sent = send_due_reminders(today, batch_size=options["batch_size"], dry_run=options["dry_run"])
+        verb = "Would send" if options["dry_run"] else "Sent"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {sent} reminder(s)."))
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+
+from .periods import resolve_periods, zone_for
+
+
+class UserPeriodsMiddleware:
+    """Attach ``request.periods`` (resolved once, on first use) and activate the user's timezone."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.periods = SimpleLazyObject(lambda: resolve_periods(request.user))
+        if request.user.is_authenticated:
+            timezone.activate(zone_for(request.periods.timezone))
+        try:
+            return self.get_response(request)
+        finally:
+            timezone.deactivate()
+
+
+class TemplateTimingMiddleware:
+    """Report template render times in a ``Server-Timing`` header, for staff or under DEBUG."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        timings = getattr(request, "template_timings", None)
+        if timings and (settings.DEBUG or request.user.is_staff):
+            response["Server-Timing"] = ", ".join(f'tpl{i};dur={ms:.1f};desc="{name}"' for i, (name, ms) in enumerate(timings))
+        return response
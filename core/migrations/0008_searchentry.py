@@ -0,0 +1,96 @@
+# Generated by Django 6.0.2 on 2026-10-19 01:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+SQLITE_SETUP = [
+    "CREATE VIRTUAL TABLE core_searchentry_fts USING fts5(owner_key, title, body, content='', tokenize='porter unicode61')",
+    """CREATE TRIGGER core_searchentry_ai AFTER INSERT ON core_searchentry BEGIN
+        INSERT INTO core_searchentry_fts(rowid, owner_key, title, body) VALUES (new.id, 'u' || new.owner_id, new.title, new.body);
+    END""",
+    """CREATE TRIGGER core_searchentry_ad AFTER DELETE ON core_searchentry BEGIN
+        INSERT INTO core_searchentry_fts(core_searchentry_fts, rowid, owner_key, title, body) VALUES ('delete', old.id, 'u' || old.owner_id, old.title, old.body);
+    END""",
+    """CREATE TRIGGER core_searchentry_au AFTER UPDATE ON core_searchentry BEGIN
+        INSERT INTO core_searchentry_fts(core_searchentry_fts, rowid, owner_key, title, body) VALUES ('delete', old.id, 'u' || old.owner_id, old.title, old.body);
+        INSERT INTO core_searchentry_fts(rowid, owner_key, title, body) VALUES (new.id, 'u' || new.owner_id, new.title, new.body);
+    END""",
+]
+SQLITE_TEARDOWN = [
+    "DROP TRIGGER IF EXISTS core_searchentry_au",
+    "DROP TRIGGER IF EXISTS core_searchentry_ad",
+    "DROP TRIGGER IF EXISTS core_searchentry_ai",
+    "DROP TABLE IF EXISTS core_searchentry_fts",
+]
+POSTGRES_SETUP = [
+    "CREATE INDEX core_searchentry_tsv ON core_searchentry USING GIN (to_tsvector('english', title || ' ' || body))",
+]
+POSTGRES_TEARDOWN = [
+    "DROP INDEX IF EXISTS core_searchentry_tsv",
+]
+
+
+def _run(schema_editor, statements):
+    for statement in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def create_text_index(apps, schema_editor):
+    _run(schema_editor, {"sqlite": SQLITE_SETUP, "postgresql": POSTGRES_SETUP})
+
+
+def drop_text_index(apps, schema_editor):
+    _run(schema_editor, {"sqlite": SQLITE_TEARDOWN, "postgresql": POSTGRES_TEARDOWN})
+
+
+def backfill(apps, schema_editor):
+    SearchEntry = apps.get_model("core", "SearchEntry")
+    DailyCheckin = apps.get_model("core", "DailyCheckin")
+    MITSession = apps.get_model("core", "MITSession")
+
+    # Flushed per chunk so memory stays flat however many rows there are.
+    entries = []
+
+    def add(entry):
+        entries.append(entry)
+        if len(entries) >= 2000:
+            SearchEntry.objects.bulk_create(entries)
+            entries.clear()
+
+    for c in DailyCheckin.objects.filter(owner__isnull=False).exclude(notes="").iterator(chunk_size=2000):
+        add(SearchEntry(owner_id=c.owner_id, kind="checkin", object_id=c.pk, checkin_id=c.pk, date=c.date, body=c.notes))
+    sessions = MITSession.objects.filter(daily_checkin__owner__isnull=False).select_related("daily_checkin")
+    for s in sessions.iterator(chunk_size=2000):
+        add(SearchEntry(owner_id=s.daily_checkin.owner_id, kind="session", object_id=s.pk, checkin_id=s.daily_checkin_id, date=s.daily_checkin.date, title=s.title, body=s.miss_reason))
+    SearchEntry.objects.bulk_create(entries)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_sessionarchive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('session', 'Focus Session'), ('checkin', 'Daily Check-in')], max_length=16)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('date', models.DateField()),
+                ('title', models.CharField(blank=True, max_length=200)),
+                ('body', models.TextField(blank=True)),
+                ('checkin', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_entries', to='core.dailycheckin')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-date'],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='unique_search_entry_per_object')],
+            },
+        ),
+        migrations.RunPython(create_text_index, drop_text_index),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
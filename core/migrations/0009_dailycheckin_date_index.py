@@ -0,0 +1,19 @@
+# Generated by Django 6.0.2 on 2026-10-19 01:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_searchentry'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dailycheckin',
+            index=models.Index(fields=['date'], name='core_checkin_date_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-19 01:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_reportexport'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userpreference',
+            name='timezone',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
@@ -0,0 +1,107 @@
+# Generated by Django 6.0.2 on 2026-10-19 01:23
+
+import struct
+import sys
+from array import array
+from collections import defaultdict
+from datetime import date, timedelta
+from pathlib import Path
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Archive file format v1 (core/archive.py at the time of this migration), frozen
+# here so later changes to the reader cannot change what this backfill computes.
+ARCHIVE_HEADER = struct.Struct("<4sHHII")
+ARCHIVE_COLUMN = struct.Struct("<16s1s3xQQ")
+ARCHIVED_COMPLETED = 1  # index of "completed" in the stored status codes
+
+
+def archived_columns(path, names):
+    data = path.read_bytes()
+    magic, version, _reserved, _row_count, column_count = ARCHIVE_HEADER.unpack_from(data, 0)
+    if magic != b"FTTA" or version != 1:
+        raise ValueError(f"{path} is not a v1 session archive.")
+    layout = {}
+    for index in range(column_count):
+        name, typecode, offset, length = ARCHIVE_COLUMN.unpack_from(data, ARCHIVE_HEADER.size + index * ARCHIVE_COLUMN.size)
+        layout[name.rstrip(b"\0").decode("ascii")] = (typecode.decode("ascii"), offset, length)
+    columns = []
+    for name in names:
+        typecode, offset, length = layout[name]
+        values = array(typecode, data[offset:offset + length])
+        if sys.byteorder == "big":
+            values.byteswap()
+        columns.append(values)
+    return columns
+
+
+def backfill(apps, schema_editor):
+    # Same totals as `manage.py rebuild_weekly_totals`: live sessions plus every
+    # archived year, so sessions restored later were already counted.
+    MITSession = apps.get_model("core", "MITSession")
+    SessionArchive = apps.get_model("core", "SessionArchive")
+    Skill = apps.get_model("core", "Skill")
+    WeeklySkillTotal = apps.get_model("core", "WeeklySkillTotal")
+
+    totals = defaultdict(lambda: [0, 0])
+    rows = (
+        MITSession.objects.filter(status="completed", skill__isnull=False)
+        .values("skill_id", "daily_checkin__date")
+        .annotate(minutes=models.Sum("actual_minutes"), sessions=models.Count("id"))
+        .order_by()
+    )
+    for row in rows.iterator(chunk_size=5000):
+        day = row["daily_checkin__date"]
+        total = totals[(row["skill_id"], day - timedelta(days=day.weekday()))]
+        total[0] += row["minutes"] or 0
+        total[1] += row["sessions"]
+
+    root = Path(getattr(settings, "SESSION_ARCHIVE_ROOT", Path(settings.BASE_DIR) / "archive"))
+    for owner_id, year in SessionArchive.objects.values_list("owner_id", "year"):
+        path = root / str(owner_id) / f"{year}.ftta"
+        if not path.exists():
+            continue
+        for ordinal, status, skill_id, actual in zip(*archived_columns(path, ("date", "status", "skill_id", "actual_minutes"))):
+            if status == ARCHIVED_COMPLETED and skill_id > 0:
+                day = date.fromordinal(ordinal)
+                total = totals[(skill_id, day - timedelta(days=day.weekday()))]
+                total[0] += max(actual, 0)
+                total[1] += 1
+
+    # Archives can name skills deleted since.
+    skill_ids = set(Skill.objects.values_list("pk", flat=True))
+    WeeklySkillTotal.objects.bulk_create(
+        [
+            WeeklySkillTotal(skill_id=skill_id, week_start=week, completed_minutes=m, completed_sessions=n)
+            for (skill_id, week), (m, n) in totals.items()
+            if skill_id in skill_ids
+        ],
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_teams'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeeklySkillTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week_start', models.DateField()),
+                ('completed_minutes', models.PositiveIntegerField(default=0)),
+                ('completed_sessions', models.PositiveIntegerField(default=0)),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='weekly_totals', to='core.skill')),
+            ],
+            options={
+                'ordering': ['skill', '-week_start'],
+                'constraints': [models.UniqueConstraint(fields=('skill', 'week_start'), name='unique_weekly_total_per_skill')],
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 6.0.2 on 2026-10-19 09:40
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def adopt_existing(apps, schema_editor):
+    # Rows stuck RUNNING before this field existed become eligible for fail_stalled;
+    # earlier FAILED rows get an expiry so purge_expired removes them.
+    ReportExport = apps.get_model("core", "ReportExport")
+    ReportExport.objects.filter(status="running", started_at__isnull=True).update(started_at=models.F("created_at"))
+    ReportExport.objects.filter(status="failed", expires_at__isnull=True).update(
+        expires_at=Coalesce("finished_at", "created_at") + timedelta(hours=24)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_userpreference_reminder_hour'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportexport',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(adopt_existing, migrations.RunPython.noop),
+    ]
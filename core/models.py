@@ -31,6 +31,9 @@ class DailyCheckin(models.Model):
         constraints = [
             models.UniqueConstraint(fields=["owner", "date"], name="unique_checkin_date_per_owner"),
         ]
+        indexes = [
+            models.Index(fields=["date"], name="core_checkin_date_idx"),
+        ]
 
     def __str__(self):
         return f"Daily Check-in {self.date}"
@@ -60,3 +63,161 @@ class MITSession(models.Model):
     def __str__(self):
         skill_name = self.skill.name if self.skill else "Unassigned"
         return f"{skill_name}: {self.title} ({self.planned_minutes}m)"
+
+
+class SessionArchive(models.Model):
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="session_archives")
+    year = models.PositiveIntegerField()
+    session_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["owner", "year"]
+        constraints = [
+            models.UniqueConstraint(fields=["owner", "year"], name="unique_session_archive_per_owner_year"),
+        ]
+
+    def __str__(self):
+        return f"Archive {self.owner_id}/{self.year} ({self.session_count} sessions)"
+
+
+class SearchEntry(models.Model):
+    class Kind(models.TextChoices):
+        SESSION = "session", "Focus Session"
+        CHECKIN = "checkin", "Daily Check-in"
+
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="search_entries")
+    kind = models.CharField(max_length=16, choices=Kind.choices)
+    object_id = models.PositiveBigIntegerField()
+    checkin = models.ForeignKey(DailyCheckin, on_delete=models.CASCADE, related_name="search_entries")
+    date = models.DateField()
+    title = models.CharField(max_length=200, blank=True)
+    body = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["-date"]
+        constraints = [
+            models.UniqueConstraint(fields=["kind", "object_id"], name="unique_search_entry_per_object"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.date}: {self.title or self.body[:40]}"
+
+
+class UserPreference(models.Model):
+    owner = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="preference")
+    reminders_enabled = models.BooleanField(default=False)
+    remind_missing_checkin = models.BooleanField(default=True)
+    remind_open_sessions = models.BooleanField(default=True)
+    reminder_hour = models.PositiveSmallIntegerField(default=18, choices=[(hour, f"{hour:02d}:00") for hour in range(24)])  # local time
+    timezone = models.CharField(max_length=64, blank=True)  # IANA name; blank falls back to settings.TIME_ZONE
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Preferences for {self.owner}"
+
+
+class ReminderLog(models.Model):
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="reminder_logs")
+    date = models.DateField()
+    missing_checkin = models.BooleanField(default=False)
+    open_sessions = models.PositiveIntegerField(default=0)
+    sent_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-date"]
+        constraints = [
+            models.UniqueConstraint(fields=["owner", "date"], name="unique_reminder_per_owner_date"),
+        ]
+
+    def __str__(self):
+        return f"Reminder {self.owner} {self.date}"
+
+
+class ReportExport(models.Model):
+    class Format(models.TextChoices):
+        CSV = "csv", "CSV"
+        JSONL = "jsonl", "JSON Lines"
+        PARQUET = "parquet", "Parquet"
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Queued"
+        RUNNING = "running", "Generating"
+        READY = "ready", "Ready"
+        FAILED = "failed", "Failed"
+
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="report_exports")
+    format = models.CharField(max_length=16, choices=Format.choices, default=Format.CSV)
+    month = models.CharField(max_length=7, blank=True)  # "YYYY-MM", blank for full history
+    all_users = models.BooleanField(default=False)
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.PENDING)
+    file_name = models.CharField(max_length=100, blank=True)
+    row_count = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)  # set once READY or FAILED; purged after
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.get_format_display()} export {self.month or 'all'} ({self.get_status_display()})"
+
+    @property
+    def download_name(self):
+        scope = "all-users" if self.all_users else "mit-summary"
+        return f"{scope}-{self.month or 'all'}.{self.format}"
+
+
+class Team(models.Model):
+    name = models.CharField(max_length=120)
+    slug = models.SlugField(max_length=120, unique=True)
+    members = models.ManyToManyField(settings.AUTH_USER_MODEL, through="TeamMembership", related_name="teams")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self):
+        return self.name
+
+
+class TeamMembership(models.Model):
+    class Role(models.TextChoices):
+        MEMBER = "member", "Member"
+        MANAGER = "manager", "Manager"
+
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name="memberships")
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="team_memberships")
+    role = models.CharField(max_length=16, choices=Role.choices, default=Role.MEMBER)
+    joined_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["team", "user__username"]
+        constraints = [
+            models.UniqueConstraint(fields=["team", "user"], name="unique_team_membership"),
+        ]
+
+    def __str__(self):
+        return f"{self.user} in {self.team} ({self.get_role_display()})"
+
+
+class WeeklySkillTotal(models.Model):
+    """Completed minutes per skill per Monday-based week, kept current by ``core.rollup``."""
+
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name="weekly_totals")
+    week_start = models.DateField()
+    completed_minutes = models.PositiveIntegerField(default=0)
+    completed_sessions = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["skill", "-week_start"]
+        constraints = [
+            models.UniqueConstraint(fields=["skill", "week_start"], name="unique_weekly_total_per_skill"),
+        ]
+
+    def __str__(self):
+        return f"{self.skill} week of {self.week_start}: {self.completed_minutes}m"
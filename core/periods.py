@@ -0,0 +1,66 @@
+from dataclasses import dataclass
+from datetime import date, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import UserPreference
+
+
+@dataclass(frozen=True)
+class Periods:
+    """A user's current day, week and month, resolved in their own timezone.
+
+    The ``*_key`` strings change exactly at the user's local midnight, so they
+    double as cache keys for anything scoped to that period.
+    """
+
+    timezone: str
+    today: date
+
+    @property
+    def week_start(self):
+        return self.today - timedelta(days=self.today.weekday())
+
+    @property
+    def week_end(self):
+        return self.week_start + timedelta(days=6)
+
+    @property
+    def day_key(self):
+        return self.today.isoformat()
+
+    @property
+    def week_key(self):
+        year, week, _weekday = self.today.isocalendar()
+        return f"{year}-W{week:02d}"
+
+    @property
+    def month_key(self):
+        return f"{self.today:%Y-%m}"
+
+
+def zone_for(name):
+    try:
+        return ZoneInfo(name or settings.TIME_ZONE)
+    except (ZoneInfoNotFoundError, ValueError):
+        return ZoneInfo(settings.TIME_ZONE)
+
+
+def periods_for_zone(name, now=None):
+    zone = zone_for(name)
+    return Periods(timezone=zone.key, today=timezone.localtime(now or timezone.now(), zone).date())
+
+
+def user_timezone(user):
+    if not user.is_authenticated:
+        return settings.TIME_ZONE
+    try:
+        return user.preference.timezone or settings.TIME_ZONE
+    except UserPreference.DoesNotExist:
+        return settings.TIME_ZONE
+
+
+def resolve_periods(user, now=None):
+    return periods_for_zone(user_timezone(user), now)
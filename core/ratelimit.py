@@ -0,0 +1,89 @@
+import math
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.http import HttpResponse
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class TokenBucket:
+    """In-process token buckets keyed by client, refilled continuously.
+
+    Each key starts with ``capacity`` tokens and regains ``rate`` per second;
+    a request spends one. State lives in this process only, which is enough
+    to shield the single SQLite writer from a bursty client.
+    """
+
+    def __init__(self, capacity, rate, max_keys=10000):
+        self.capacity = capacity
+        self.rate = rate
+        self.max_keys = max_keys
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key, now=None):
+        """Spend one token for ``key``; returns seconds to wait, or 0 if allowed."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, last = self._buckets.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - last) * self.rate)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now)
+                return (1 - tokens) / self.rate
+            self._buckets[key] = (tokens - 1, now)
+            if len(self._buckets) > self.max_keys:
+                self._prune(now)
+            return 0
+
+    def _prune(self, now):
+        # A bucket that would have refilled completely is the same as no bucket.
+        full_after = self.capacity / self.rate
+        self._buckets = {key: state for key, state in self._buckets.items() if now - state[1] < full_after}
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def bucket_for(scope):
+    """The shared bucket for ``scope`` from ``settings.RATE_LIMITS``, or ``None`` if unlimited."""
+    config = getattr(settings, "RATE_LIMITS", {}).get(scope)
+    if not config:
+        return None
+    with _buckets_lock:
+        bucket = _buckets.get(scope)
+        if bucket is None or (bucket.capacity, bucket.rate) != tuple(config):
+            bucket = _buckets[scope] = TokenBucket(*config)
+        return bucket
+
+
+def client_key(request):
+    return f"user:{request.user.pk}"
+
+
+def rate_limit(scope="writes"):
+    """Limit each user's unsafe requests to the decorated view; over-limit users get a 429 with ``Retry-After``.
+
+    Keyed on the logged-in user, so apply it under ``login_required``. Behind
+    the reverse proxy every anonymous client shares one address, so there is
+    no sound key for them here.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in SAFE_METHODS:
+                bucket = bucket_for(scope)
+                wait = bucket.take(client_key(request)) if bucket else 0
+                if wait:
+                    response = HttpResponse("Too many changes in a short time. Please wait a moment and try again.", status=429, content_type="text/plain")
+                    response["Retry-After"] = str(math.ceil(wait))
+                    return response
+            return view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
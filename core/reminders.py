@@ -0,0 +1,128 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Count, Exists, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import DailyCheckin, MITSession, ReminderLog, UserPreference
+from .periods import zone_for
+
+
+def due_reminders(today, zone=None, hour=None):
+    """Users owed a reminder for ``today``, found in one query.
+
+    Each user is annotated with ``has_checkin`` and ``open_sessions`` (this
+    week's sessions that are not completed); users already reminded today
+    are excluded. ``zone`` limits the query to users with that timezone
+    preference, so ``today`` can be each group's own local date, and
+    ``hour`` (that zone's local hour) to users whose send time has passed.
+    """
+    week_start = today - timedelta(days=today.weekday())
+    open_sessions = (
+        MITSession.objects.filter(daily_checkin__owner=OuterRef("pk"), daily_checkin__date__range=(week_start, today))
+        .exclude(status=MITSession.Status.COMPLETED)
+        .order_by()
+        .values("daily_checkin__owner")
+        .annotate(n=Count("id"))
+        .values("n")
+    )
+    users = get_user_model().objects.filter(is_active=True, preference__reminders_enabled=True)
+    if zone is not None:
+        users = users.filter(preference__timezone=zone)
+    if hour is not None:
+        users = users.filter(preference__reminder_hour__lte=hour)
+    return (
+        users.exclude(email="")
+        .annotate(
+            has_checkin=Exists(DailyCheckin.objects.filter(owner=OuterRef("pk"), date=today)),
+            open_sessions=Coalesce(Subquery(open_sessions, output_field=IntegerField()), Value(0)),
+            already_sent=Exists(ReminderLog.objects.filter(owner=OuterRef("pk"), date=today)),
+        )
+        .filter(already_sent=False)
+        .filter(
+            Q(preference__remind_missing_checkin=True, has_checkin=False)
+            | Q(preference__remind_open_sessions=True, open_sessions__gt=0)
+        )
+        .select_related("preference")
+        .order_by("pk")
+    )
+
+
+def _message(user, today):
+    preference = user.preference
+    context = {
+        "user": user,
+        "today": today,
+        "missing_checkin": preference.remind_missing_checkin and not user.has_checkin,
+        "open_sessions": user.open_sessions if preference.remind_open_sessions else 0,
+        "site_url": getattr(settings, "SITE_URL", ""),
+    }
+    subject = render_to_string("core/email/reminder_subject.txt", context).strip()
+    body = render_to_string("core/email/reminder.txt", context)
+    return EmailMessage(subject, body, to=[user.email]), context
+
+
+def due_groups(today=None, now=None):
+    """(today, zone, hour) to dispatch: one per distinct timezone preference, with its local date and hour.
+
+    An explicit ``today`` is a manual run for that date: every zone, no send-hour check.
+    """
+    if today is not None:
+        return [(today, None, None)]
+    now = now or timezone.now()
+    zones = UserPreference.objects.filter(reminders_enabled=True).order_by().values_list("timezone", flat=True).distinct()
+    groups = []
+    for zone in zones:
+        local = timezone.localtime(now, zone_for(zone))
+        groups.append((local.date(), zone, local.hour))
+    return groups
+
+
+def send_due_reminders(today=None, batch_size=100, dry_run=False, now=None):
+    """Render and send reminders in batches over one mail connection; returns the count sent.
+
+    Without an explicit ``today`` each user is judged against their own local
+    date, and only once their local time has reached their send hour.
+    """
+    sent = 0
+    connection = None if dry_run else get_connection()
+
+    def send(batch):
+        # One message per call, so if the backend raises partway through, the
+        # reminders that did go out are still logged and are not sent again.
+        delivered = []
+        try:
+            for message, log in batch:
+                if connection.send_messages([message]):
+                    delivered.append(log)
+        finally:
+            ReminderLog.objects.bulk_create(delivered, ignore_conflicts=True)
+        return len(delivered)
+
+    if connection is not None:
+        connection.open()
+    try:
+        for day, zone, hour in due_groups(today, now):
+            due = due_reminders(day, zone, hour)
+            last_pk = 0
+            while True:
+                # Each page is its own query, read in full before any mail goes
+                # out, so no read cursor stays open across SMTP round trips.
+                users = list(due.filter(pk__gt=last_pk)[:batch_size])
+                if not users:
+                    break
+                last_pk = users[-1].pk
+                batch = []
+                for user in users:
+                    message, context = _message(user, day)
+                    log = ReminderLog(owner=user, date=day, missing_checkin=context["missing_checkin"], open_sessions=context["open_sessions"])
+                    batch.append((message, log))
+                sent += len(batch) if connection is None else send(batch)
+    finally:
+        if connection is not None:
+            connection.close()
+    return sent
@@ -0,0 +1,30 @@
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+
+from . import archive
+from .models import MITSession
+
+
+def monthly_summary_rows(owner, year=None, month=None):
+    """Per month and focus category: session count, completed count, planned and actual minutes.
+
+    Newest month first, categories by name; archived years are folded in.
+    """
+    sessions = MITSession.objects.filter(daily_checkin__owner=owner)
+    if year is not None:
+        sessions = sessions.filter(daily_checkin__date__year=year, daily_checkin__date__month=month)
+    rows = (
+        sessions.annotate(month=TruncMonth("daily_checkin__date"))
+        .values("month", "skill__name")
+        .annotate(
+            count=Count("id"),
+            completed=Count("id", filter=Q(status=MITSession.Status.COMPLETED)),
+            planned_minutes=Sum("planned_minutes"),
+            actual_minutes=Sum("actual_minutes"),
+        )
+        .order_by("-month", "skill__name")
+    )
+    archived = archive.summary_rows(owner, year=year, month=month)
+    if archived:
+        rows = archive.merge_summary_rows(rows, archived)
+    return rows
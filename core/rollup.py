@@ -0,0 +1,175 @@
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Greatest
+
+from .cache import bump_cache_version
+from .models import DailyCheckin, MITSession, SessionArchive, Skill, WeeklySkillTotal
+
+COMPLETED = MITSession.Status.COMPLETED
+UNKNOWN = object()
+CONTRIBUTION_FIELDS = ("skill_id", "daily_checkin_id", "status", "actual_minutes")
+_paused = threading.local()
+
+
+def week_of(day):
+    return day - timedelta(days=day.weekday())
+
+
+def contribution(session):
+    """``(skill_id, checkin_id, minutes)`` a session adds to the rollup, or ``None`` if it adds nothing.
+
+    Reads only loaded field values, so it never queries; deferred instances
+    give ``UNKNOWN`` and are resolved with ``stored_contribution``.
+    """
+    values = session.__dict__
+    if any(name not in values for name in CONTRIBUTION_FIELDS):
+        return UNKNOWN
+    return _contribution(values)
+
+
+def _contribution(values):
+    if values["status"] != COMPLETED or values["skill_id"] is None:
+        return None
+    return values["skill_id"], values["daily_checkin_id"], values["actual_minutes"] or 0
+
+
+def stored_contribution(session_id):
+    values = MITSession.objects.filter(pk=session_id).values(*CONTRIBUTION_FIELDS).first()
+    return _contribution(values) if values else None
+
+
+def apply(skill_id, week_start, minutes, sessions):
+    """Add (or with negative values, remove) one contribution to a week's running total.
+
+    Removals clamp at zero: the columns are unsigned, and a total that drifted
+    low must not turn the user's save into an IntegrityError.
+    """
+    updated = WeeklySkillTotal.objects.filter(skill_id=skill_id, week_start=week_start).update(
+        completed_minutes=Greatest(F("completed_minutes") + minutes, 0),
+        completed_sessions=Greatest(F("completed_sessions") + sessions, 0),
+    )
+    if not updated and sessions > 0:
+        _total, created = WeeklySkillTotal.objects.get_or_create(
+            skill_id=skill_id, week_start=week_start, defaults={"completed_minutes": minutes, "completed_sessions": sessions}
+        )
+        if not created:
+            apply(skill_id, week_start, minutes, sessions)
+
+
+def _checkin_date(checkin_id, session=None):
+    cached = session._state.fields_cache.get("daily_checkin") if session is not None else None
+    if cached is not None and cached.pk == checkin_id:
+        return cached.date
+    return DailyCheckin.objects.filter(pk=checkin_id).values_list("date", flat=True).first()
+
+
+def is_paused():
+    return getattr(_paused, "active", False)
+
+
+@contextmanager
+def paused():
+    """Leave totals untouched for session deletes inside the block (used when archiving history)."""
+    previous = is_paused()
+    _paused.active = True
+    try:
+        yield
+    finally:
+        _paused.active = previous
+
+
+def session_saved(session, previous):
+    current = contribution(session)
+    if current is UNKNOWN:
+        current = stored_contribution(session.pk)
+    if current == previous:
+        return
+    if previous is not None:
+        day = _checkin_date(previous[1], session)
+        if day is not None:
+            apply(previous[0], week_of(day), -previous[2], -1)
+    if current is not None:
+        apply(current[0], week_of(_checkin_date(current[1], session)), current[2], 1)
+
+
+def session_deleted(session, previous):
+    if previous is None or is_paused():
+        return
+    day = _checkin_date(previous[1], session)
+    if day is not None:
+        apply(previous[0], week_of(day), -previous[2], -1)
+
+
+def checkin_moved(checkin, old_date):
+    """Shift a check-in's completed sessions to the week of its new date."""
+    old_week, new_week = week_of(old_date), week_of(checkin.date)
+    if old_week == new_week:
+        return
+    rows = (
+        MITSession.objects.filter(daily_checkin=checkin, status=COMPLETED, skill__isnull=False)
+        .values("skill_id")
+        .annotate(minutes=Sum("actual_minutes"), sessions=Count("id"))
+        .order_by()
+    )
+    for row in rows:
+        minutes = row["minutes"] or 0
+        apply(row["skill_id"], old_week, -minutes, -row["sessions"])
+        apply(row["skill_id"], new_week, minutes, row["sessions"])
+
+
+def weekly_totals(sessions, archived_rows):
+    """{(skill_id, week_start): [minutes, sessions]} over a session queryset plus archived row dicts."""
+    totals = defaultdict(lambda: [0, 0])
+    rows = (
+        sessions.filter(status=COMPLETED, skill__isnull=False)
+        .values("skill_id", "daily_checkin__date")
+        .annotate(minutes=Sum("actual_minutes"), sessions=Count("id"))
+        .order_by()
+    )
+    for row in rows.iterator(chunk_size=5000):
+        total = totals[(row["skill_id"], week_of(row["daily_checkin__date"]))]
+        total[0] += row["minutes"] or 0
+        total[1] += row["sessions"]
+    for row in archived_rows:
+        if row["status"] == COMPLETED and row["skill_id"]:
+            total = totals[(row["skill_id"], week_of(row["date"]))]
+            total[0] += row["actual_minutes"] or 0
+            total[1] += 1
+    return totals
+
+
+def rebuild(owner=None):
+    """Recompute totals from scratch: live sessions plus archived years."""
+    # Imported here so the signal handlers don't load the archive reader at start-up.
+    from . import archive
+
+    sessions = MITSession.objects.all()
+    archives = SessionArchive.objects.all()
+    if owner is not None:
+        sessions = sessions.filter(skill__owner=owner)
+        archives = archives.filter(owner=owner)
+    totals = weekly_totals(sessions, archive.entry_rows(archives))
+
+    existing = WeeklySkillTotal.objects.all() if owner is None else WeeklySkillTotal.objects.filter(skill__owner=owner)
+    # Archives can name skills deleted since.
+    skills = Skill.objects.all() if owner is None else Skill.objects.filter(owner=owner)
+    skill_ids = set(skills.values_list("pk", flat=True))
+    with transaction.atomic():
+        existing.delete()
+        WeeklySkillTotal.objects.bulk_create(
+            [
+                WeeklySkillTotal(skill_id=skill_id, week_start=week, completed_minutes=minutes, completed_sessions=count)
+                for (skill_id, week), (minutes, count) in totals.items()
+                if skill_id in skill_ids
+            ],
+            batch_size=2000,
+        )
+        # Cached goal progress reads these totals; without a bump it stays stale until the day key rolls over.
+        for owner_id in skills.values_list("owner_id", flat=True).distinct():
+            bump_cache_version(owner_id)
+    return len(totals)
@@ -0,0 +1,212 @@
+import re
+import threading
+from contextlib import contextmanager
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import DailyCheckin, MITSession, SearchEntry
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_paused = threading.local()
+
+
+def index_session(session):
+    owner_id = session.daily_checkin.owner_id
+    if owner_id is None:
+        return
+    SearchEntry.objects.update_or_create(
+        kind=SearchEntry.Kind.SESSION,
+        object_id=session.pk,
+        defaults={
+            "owner_id": owner_id,
+            "checkin_id": session.daily_checkin_id,
+            "date": session.daily_checkin.date,
+            "title": session.title,
+            "body": session.miss_reason,
+        },
+    )
+
+
+def index_sessions(sessions):
+    """Bulk (re)index sessions written without signals, e.g. by ``bulk_create``."""
+    sessions = [s for s in sessions if s.daily_checkin.owner_id is not None]
+    SearchEntry.objects.filter(kind=SearchEntry.Kind.SESSION, object_id__in=[s.pk for s in sessions]).delete()
+    SearchEntry.objects.bulk_create(
+        [
+            SearchEntry(
+                owner_id=s.daily_checkin.owner_id,
+                kind=SearchEntry.Kind.SESSION,
+                object_id=s.pk,
+                checkin_id=s.daily_checkin_id,
+                date=s.daily_checkin.date,
+                title=s.title,
+                body=s.miss_reason,
+            )
+            for s in sessions
+        ],
+        batch_size=1000,
+    )
+
+
+def index_checkin(checkin):
+    if checkin.owner_id is None or not checkin.notes:
+        unindex(SearchEntry.Kind.CHECKIN, checkin.pk)
+    else:
+        SearchEntry.objects.update_or_create(
+            kind=SearchEntry.Kind.CHECKIN,
+            object_id=checkin.pk,
+            defaults={"owner_id": checkin.owner_id, "checkin_id": checkin.pk, "date": checkin.date, "title": "", "body": checkin.notes},
+        )
+    # Session entries carry their check-in's date for display.
+    SearchEntry.objects.filter(checkin=checkin, kind=SearchEntry.Kind.SESSION).exclude(date=checkin.date).update(date=checkin.date)
+
+
+def unindex(kind, object_id):
+    SearchEntry.objects.filter(kind=kind, object_id=object_id).delete()
+
+
+def unindex_sessions(session_ids):
+    SearchEntry.objects.filter(kind=SearchEntry.Kind.SESSION, object_id__in=session_ids).delete()
+
+
+def is_paused():
+    return getattr(_paused, "active", False)
+
+
+@contextmanager
+def paused():
+    """Skip per-row unindexing of session deletes inside the block; the caller unindexes in bulk."""
+    previous = is_paused()
+    _paused.active = True
+    try:
+        yield
+    finally:
+        _paused.active = previous
+
+
+def rebuild(owner=None):
+    entries = SearchEntry.objects.all()
+    checkins = DailyCheckin.objects.filter(owner__isnull=False)
+    sessions = MITSession.objects.filter(daily_checkin__owner__isnull=False).select_related("daily_checkin")
+    if owner is not None:
+        entries, checkins, sessions = entries.filter(owner=owner), checkins.filter(owner=owner), sessions.filter(daily_checkin__owner=owner)
+    entries.delete()
+    for checkin in checkins.exclude(notes="").iterator(chunk_size=2000):
+        index_checkin(checkin)
+    batch = []
+    for session in sessions.iterator(chunk_size=2000):
+        batch.append(session)
+        if len(batch) == 2000:
+            index_sessions(batch)
+            batch = []
+    index_sessions(batch)
+
+
+class SearchResults:
+    """Lazy, ranked result set for one owner; sliceable so ``Paginator`` can page it."""
+
+    def __init__(self, owner, query):
+        self.owner = owner
+        self.query = query
+        self.tokens = TOKEN_RE.findall(query)
+        self._count = None
+
+    def _fts_match(self):
+        terms = " ".join(f'"{t}"*' for t in self.tokens)
+        return f'owner_key : "u{self.owner.pk}" AND {{title body}} : ({terms})'
+
+    def count(self):
+        if self._count is None:
+            if not self.tokens:
+                self._count = 0
+            elif connection.vendor == "sqlite":
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT COUNT(*) FROM core_searchentry_fts WHERE core_searchentry_fts MATCH %s", [self._fts_match()])
+                    self._count = cursor.fetchone()[0]
+            elif connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT COUNT(*) FROM core_searchentry WHERE owner_id = %s "
+                        "AND to_tsvector('english', title || ' ' || body) @@ websearch_to_tsquery('english', %s)",
+                        [self.owner.pk, " ".join(self.tokens)],
+                    )
+                    self._count = cursor.fetchone()[0]
+            else:
+                self._count = self._fallback().count()
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def _ranked_ids(self, limit, offset):
+        if connection.vendor == "sqlite":
+            sql = (
+                "SELECT rowid FROM core_searchentry_fts WHERE core_searchentry_fts MATCH %s "
+                "ORDER BY bm25(core_searchentry_fts, 0.0, 2.0, 1.0) LIMIT %s OFFSET %s"
+            )
+            params = [self._fts_match(), limit, offset]
+        else:
+            sql = (
+                "SELECT id FROM core_searchentry WHERE owner_id = %s "
+                "AND to_tsvector('english', title || ' ' || body) @@ websearch_to_tsquery('english', %s) "
+                "ORDER BY ts_rank(to_tsvector('english', title || ' ' || body), websearch_to_tsquery('english', %s)) DESC, date DESC "
+                "LIMIT %s OFFSET %s"
+            )
+            terms = " ".join(self.tokens)
+            params = [self.owner.pk, terms, terms, limit, offset]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [row[0] for row in cursor.fetchall()]
+
+    def _fallback(self):
+        entries = SearchEntry.objects.filter(owner=self.owner)
+        for token in self.tokens:
+            entries = entries.filter(Q(title__icontains=token) | Q(body__icontains=token))
+        return entries
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        if not self.tokens:
+            return []
+        offset = key.start or 0
+        limit = (key.stop if key.stop is not None else self.count()) - offset
+        if limit <= 0:
+            return []
+        if connection.vendor not in ("sqlite", "postgresql"):
+            return list(self._fallback()[offset:offset + limit])
+        ids = self._ranked_ids(limit, offset)
+        entries = SearchEntry.objects.select_related("checkin").in_bulk(ids)
+        return [entries[pk] for pk in ids if pk in entries]
+
+
+def session_ids_matching(query):
+    """Subquery of MITSession ids whose indexed text matches ``query`` for any owner.
+
+    Returns ``None`` when the backend has no text index, so callers can fall back to LIKE.
+    """
+    tokens = TOKEN_RE.findall(query)
+    if not tokens:
+        return None
+    if connection.vendor == "sqlite":
+        terms = " ".join(f'"{t}"*' for t in tokens)
+        # CROSS JOIN pins the FTS match as the outer loop; with a plain JOIN
+        # SQLite may walk every session entry and re-run the match for each.
+        return RawSQL(
+            "SELECT e.object_id FROM core_searchentry_fts f CROSS JOIN core_searchentry e ON e.id = f.rowid "
+            "WHERE core_searchentry_fts MATCH %s AND e.kind = %s",
+            [f"{{title body}} : ({terms})", SearchEntry.Kind.SESSION],
+        )
+    if connection.vendor == "postgresql":
+        return RawSQL(
+            "SELECT object_id FROM core_searchentry WHERE kind = %s "
+            "AND to_tsvector('english', title || ' ' || body) @@ websearch_to_tsquery('english', %s)",
+            [SearchEntry.Kind.SESSION, " ".join(tokens)],
+        )
+    return None
+
+
+def search(owner, query):
+    return SearchResults(owner, query)
@@ -0,0 +1,83 @@
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import rollup, search
+from .cache import bump_cache_version
+from .models import DailyCheckin, MITSession, SearchEntry, Skill, UserPreference
+
+
+@receiver(post_save, sender=MITSession)
+def index_session(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_session(instance)
+        bump_cache_version(instance.daily_checkin.owner_id)
+
+
+@receiver(post_delete, sender=MITSession)
+def unindex_session(sender, instance, **kwargs):
+    if search.is_paused():
+        return
+    search.unindex(SearchEntry.Kind.SESSION, instance.pk)
+    checkin = instance._state.fields_cache.get("daily_checkin")
+    if checkin is not None:
+        owner_id = checkin.owner_id
+    else:
+        owner_id = DailyCheckin.objects.filter(pk=instance.daily_checkin_id).values_list("owner_id", flat=True).first()
+    bump_cache_version(owner_id)
+
+
+@receiver(post_save, sender=DailyCheckin)
+def index_checkin(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_checkin(instance)
+        bump_cache_version(instance.owner_id)
+
+
+@receiver(post_delete, sender=DailyCheckin)
+def unindex_checkin(sender, instance, **kwargs):
+    search.unindex(SearchEntry.Kind.CHECKIN, instance.pk)
+    bump_cache_version(instance.owner_id)
+
+
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+@receiver(post_save, sender=UserPreference)
+def invalidate_dashboard(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_cache_version(instance.owner_id)
+
+
+@receiver(post_init, sender=MITSession)
+def remember_session_contribution(sender, instance, **kwargs):
+    instance._rollup_previous = rollup.contribution(instance)
+
+
+@receiver(pre_save, sender=MITSession)
+@receiver(pre_delete, sender=MITSession)
+def resolve_session_contribution(sender, instance, raw=False, **kwargs):
+    if not raw and instance._rollup_previous is rollup.UNKNOWN:
+        instance._rollup_previous = rollup.stored_contribution(instance.pk) if instance.pk else None
+
+
+@receiver(post_save, sender=MITSession)
+def update_weekly_totals(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        rollup.session_saved(instance, None if created else instance._rollup_previous)
+        instance._rollup_previous = rollup.contribution(instance)
+
+
+@receiver(post_delete, sender=MITSession)
+def remove_from_weekly_totals(sender, instance, **kwargs):
+    rollup.session_deleted(instance, instance._rollup_previous)
+
+
+@receiver(post_init, sender=DailyCheckin)
+def remember_checkin_date(sender, instance, **kwargs):
+    instance._rollup_date = instance.__dict__.get("date")
+
+
+@receiver(post_save, sender=DailyCheckin)
+def move_weekly_totals(sender, instance, created, raw=False, **kwargs):
+    if not raw and not created and instance._rollup_date and instance._rollup_date != instance.date:
+        rollup.checkin_moved(instance, instance._rollup_date)
+    instance._rollup_date = instance.date
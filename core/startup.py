@@ -0,0 +1,135 @@
+"""Process start-up helpers: an import-time profiler and a worker warm-up hook.
+
+Only the standard library is imported at module level, so the profiler can
+be installed before Django itself is imported.
+"""
+
+import importlib
+import json
+import sys
+import time
+
+# Templates compiled by ``warm_up`` so the first page view skips parsing them.
+WARM_TEMPLATES = [
+    "base.html",
+    "core/landing.html",
+    "core/home.html",
+    "core/checkin_form.html",
+    "registration/login.html",
+]
+
+
+class _TimedLoader:
+    """Wraps a module loader and records how long executing each module took."""
+
+    def __init__(self, loader, profiler):
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profiler.enter(module.__name__)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler.leave()
+
+
+class ImportProfiler:
+    """Meta path hook timing every module executed while installed.
+
+    Unlike ``python -X importtime`` this also sees modules loaded through
+    ``importlib.import_module``, which is how Django loads apps, models,
+    URLconfs and views.
+    """
+
+    def __init__(self):
+        self.records = []
+        self._stack = []
+
+    def find_spec(self, fullname, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, self)
+                return spec
+        return None
+
+    def enter(self, name):
+        self._stack.append([name, time.perf_counter(), 0.0])
+
+    def leave(self):
+        name, started, children = self._stack.pop()
+        cumulative = time.perf_counter() - started
+        if self._stack:
+            self._stack[-1][2] += cumulative
+        self.records.append({"module": name, "self_us": round((cumulative - children) * 1e6), "cumulative_us": round(cumulative * 1e6), "depth": len(self._stack)})
+
+    def install(self):
+        sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        sys.meta_path.remove(self)
+
+
+def profile(target, first_request=False):
+    """Import ``target`` under the profiler; with ``first_request`` also load the URLconf and its views."""
+    profiler = ImportProfiler()
+    profiler.install()
+    started = time.perf_counter()
+    try:
+        importlib.import_module(target)
+        import_ms = (time.perf_counter() - started) * 1000
+        if first_request:
+            from django.urls import get_resolver
+
+            get_resolver().url_patterns
+    finally:
+        profiler.uninstall()
+    return {"import_ms": import_ms, "total_ms": (time.perf_counter() - started) * 1000, "records": profiler.records}
+
+
+def warm_up(templates=True, database=True):
+    """Pay one-off start-up costs before a worker takes traffic.
+
+    Loads the URLconf (and with it every view module), compiles the most
+    used templates into the cached loader, and opens each database
+    connection. Safe to call more than once.
+    """
+    from django.db import connections
+    from django.template import TemplateDoesNotExist, engines
+    from django.template.backends.django import DjangoTemplates
+    from django.urls import get_resolver
+
+    resolver = get_resolver()
+    resolver.url_patterns
+    # Builds the lookup tables the first {% url %} would. This walks every
+    # included URLconf, admin_urls too, so admin.py modules load here: in the
+    # gunicorn master, once, rather than in each worker's first request.
+    resolver.reverse_dict
+    if templates:
+        for engine in engines.all():
+            if not isinstance(engine, DjangoTemplates):
+                continue
+            for name in WARM_TEMPLATES:
+                try:
+                    engine.get_template(name)
+                except TemplateDoesNotExist:
+                    pass
+    if database:
+        for connection in connections.all():
+            connection.ensure_connection()
+
+
+if __name__ == "__main__":
+    # python -m core.startup <module> [--first-request]; prints JSON for `manage.py profile_startup`.
+    result = profile(sys.argv[1], first_request="--first-request" in sys.argv[2:])
+    json.dump(result, sys.stdout)
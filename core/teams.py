@@ -0,0 +1,117 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db.models import Count, Q, Sum
+
+from .models import MITSession, TeamMembership
+
+COMPLETED = MITSession.Status.COMPLETED
+SCOPES = ("week", "month")
+
+
+def _rate(part, whole):
+    return round((part / whole) * 100, 1) if whole else 0
+
+
+class TeamDashboard:
+    """Aggregates for one team over the viewer's current week or month.
+
+    Every figure comes from grouped queries over all members' sessions at
+    once (per member, per category, per day), so the page costs the same
+    handful of queries whether the team has five members or five hundred.
+    """
+
+    def __init__(self, team, periods, scope="week"):
+        self.team = team
+        self.periods = periods
+        self.scope = scope if scope in SCOPES else "week"
+        if self.scope == "month":
+            self.start = periods.today.replace(day=1)
+            self.end = (self.start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        else:
+            self.start, self.end = periods.week_start, periods.week_end
+
+    def _sessions(self):
+        member_ids = TeamMembership.objects.filter(team=self.team).values("user_id")
+        return MITSession.objects.filter(
+            daily_checkin__owner__in=member_ids,
+            daily_checkin__date__range=(self.start, self.end),
+        ).order_by()
+
+    def _totals(self):
+        return {
+            "total": Count("id"),
+            "completed": Count("id", filter=Q(status=COMPLETED)),
+            "minutes": Sum("actual_minutes", filter=Q(status=COMPLETED)),
+        }
+
+    def members(self):
+        """One row per member, including members with nothing logged; busiest first."""
+        rows = self._sessions().values("daily_checkin__owner").annotate(**self._totals())
+        by_owner = {row["daily_checkin__owner"]: row for row in rows}
+        members = []
+        for membership in TeamMembership.objects.filter(team=self.team).select_related("user").order_by("user__username"):
+            row = by_owner.get(membership.user_id, {})
+            total, completed = row.get("total", 0), row.get("completed", 0)
+            members.append({
+                "user": membership.user,
+                "role": membership.get_role_display(),
+                "total": total,
+                "completed": completed,
+                "minutes": row.get("minutes") or 0,
+                "completion_rate": _rate(completed, total),
+            })
+        members.sort(key=lambda m: -m["minutes"])
+        return members
+
+    def summary(self, members):
+        total = sum(m["total"] for m in members)
+        completed = sum(m["completed"] for m in members)
+        minutes = sum(m["minutes"] for m in members)
+        active = sum(1 for m in members if m["total"])
+        return {
+            "member_count": len(members),
+            "active_members": active,
+            "total": total,
+            "completed": completed,
+            "minutes": minutes,
+            "completion_rate": _rate(completed, total),
+            "minutes_per_active_member": round(minutes / active) if active else 0,
+        }
+
+    def category_mix(self, limit=10):
+        # Categories are per user, so equal names across members are pooled.
+        rows = (
+            self._sessions()
+            .filter(status=COMPLETED)
+            .values("skill__name")
+            .annotate(sessions=Count("id"), minutes=Sum("actual_minutes"))
+            .order_by("-minutes", "skill__name")[:limit]
+        )
+        return [name or "(No category)" for name in (r["skill__name"] for r in rows)], [r["minutes"] or 0 for r in rows]
+
+    def daily_trend(self):
+        rows = self._sessions().filter(status=COMPLETED).values("daily_checkin__date").annotate(minutes=Sum("actual_minutes"))
+        minutes = defaultdict(int, {r["daily_checkin__date"]: r["minutes"] or 0 for r in rows})
+        days = [self.start + timedelta(days=offset) for offset in range((self.end - self.start).days + 1)]
+        return [day.strftime("%a %d" if self.scope == "week" else "%d") for day in days], [minutes[day] for day in days]
+
+    @property
+    def range_label(self):
+        return f"{self.start:%b %d} – {self.end:%b %d}"
+
+    def context(self, include_members=True):
+        members = self.members()
+        category_labels, category_data = self.category_mix()
+        trend_labels, trend_minutes = self.daily_trend()
+        return {
+            "team": self.team,
+            "scope": self.scope,
+            "range_label": self.range_label,
+            "team_summary": self.summary(members),
+            "members": members if include_members else None,
+            "category_labels": category_labels,
+            "category_data": category_data,
+            "trend_labels": trend_labels,
+            "trend_minutes": trend_minutes,
+        }
@@ -0,0 +1,47 @@
+import logging
+import time
+
+from django.conf import settings
+from django.template.backends.django import DjangoTemplates
+
+logger = logging.getLogger(__name__)
+
+
+class TimedTemplate:
+    """Backend template wrapper that times each top-level render.
+
+    The time includes everything the template extends and includes. Each
+    render is logged at DEBUG, or at WARNING past ``TEMPLATE_SLOW_MS``,
+    and appended to ``request.template_timings`` for the Server-Timing
+    header (see ``core.middleware.TemplateTimingMiddleware``).
+    """
+
+    def __init__(self, template):
+        self._template = template
+
+    def __getattr__(self, name):
+        return getattr(self._template, name)
+
+    def render(self, context=None, request=None):
+        started = time.perf_counter()
+        try:
+            return self._template.render(context, request)
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            name = self._template.origin.template_name or "<string>"
+            slow = elapsed >= getattr(settings, "TEMPLATE_SLOW_MS", 50)
+            logger.log(logging.WARNING if slow else logging.DEBUG, "Rendered %s in %.1f ms", name, elapsed)
+            if request is not None:
+                if not hasattr(request, "template_timings"):
+                    request.template_timings = []
+                request.template_timings.append((name, elapsed))
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """The stock Django backend, with render timing on every template it returns."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
@@ -1,3 +1,329 @@
-from django.test import TestCase
+import os
+import tempfile
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import archive, consistency, exports, rollup, search
+from .cache import current_version
+from .models import DailyCheckin, MITSession, ReminderLog, ReportExport, SearchEntry, SessionArchive, Skill, Team, TeamMembership, UserPreference
+from .reminders import send_due_reminders
+
+
+@override_settings(CACHES=consistency.ISOLATED_CACHES)
+class ConsistencyTests(TransactionTestCase):
+    # Transactional so cache invalidation, which waits for commit, behaves as in production.
+
+    def test_generated_histories_match_reference(self):
+        checked, failures = consistency.run_generated(25, seed=20261019)
+        self.assertEqual(checked, 25)
+        self.assertEqual(failures, [], failures[:1])
+
+
+@override_settings(CACHES=consistency.ISOLATED_CACHES)
+class CacheVersionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create(username="versioned")
+
+    def test_bump_waits_for_commit(self):
+        before = current_version(self.user.pk)
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            Skill.objects.create(owner=self.user, name="Writing")
+        self.assertEqual(current_version(self.user.pk), before)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(current_version(self.user.pk), before)
+
+    def test_rebuilding_weekly_totals_invalidates_dashboards(self):
+        Skill.objects.create(owner=self.user, name="Writing")
+        before = current_version(self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            rollup.rebuild()
+        self.assertNotEqual(current_version(self.user.pk), before)
+
+
+@override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+class ReminderTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create(username="ana", email="ana@example.com")
+        UserPreference.objects.create(owner=self.user, reminders_enabled=True, timezone="America/New_York", reminder_hour=9)
+
+    def test_waits_for_local_send_hour(self):
+        # 12:30 UTC is 08:30 in New York (EDT): too early.
+        self.assertEqual(send_due_reminders(now=datetime(2026, 6, 10, 12, 30, tzinfo=dt_timezone.utc)), 0)
+        self.assertEqual(send_due_reminders(now=datetime(2026, 6, 10, 13, 30, tzinfo=dt_timezone.utc)), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("You haven't logged a daily focus check-in for Wednesday, Jun 10", mail.outbox[0].body)
+
+    def test_local_date_after_utc_midnight(self):
+        # 02:00 UTC on the 11th is still 22:00 on the 10th in New York.
+        send_due_reminders(now=datetime(2026, 6, 11, 2, 0, tzinfo=dt_timezone.utc))
+        self.assertEqual(list(ReminderLog.objects.values_list("date", flat=True)), [date(2026, 6, 10)])
+
+    def test_once_per_day(self):
+        now = datetime(2026, 6, 10, 20, 0, tzinfo=dt_timezone.utc)
+        self.assertEqual(send_due_reminders(now=now), 1)
+        self.assertEqual(send_due_reminders(now=now), 0)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_checked_in_with_open_sessions(self):
+        checkin = DailyCheckin.objects.create(owner=self.user, date=date(2026, 6, 10))
+        MITSession.objects.create(daily_checkin=checkin, title="Draft", status=MITSession.Status.PLANNED)
+        send_due_reminders(now=datetime(2026, 6, 10, 20, 0, tzinfo=dt_timezone.utc))
+        self.assertEqual(mail.outbox[0].subject, "You have 1 open focus session · Focused Time Tracker")
+        self.assertNotIn("check-in", mail.outbox[0].body)
+
+    def test_nothing_to_remind(self):
+        self.user.preference.remind_open_sessions = False
+        self.user.preference.save()
+        DailyCheckin.objects.create(owner=self.user, date=date(2026, 6, 10))
+        self.assertEqual(send_due_reminders(now=datetime(2026, 6, 10, 20, 0, tzinfo=dt_timezone.utc)), 0)
+
+    def test_explicit_date_ignores_send_hour(self):
+        self.user.preference.reminder_hour = 23
+        self.user.preference.save()
+        self.assertEqual(send_due_reminders(today=date(2026, 6, 10)), 1)
+
+    def test_failed_send_keeps_earlier_reminders_logged(self):
+        other = get_user_model().objects.create(username="ben", email="ben@example.com")
+        UserPreference.objects.create(owner=other, reminders_enabled=True, timezone="America/New_York", reminder_hour=9)
+        calls = []
+
+        def send_messages(backend, messages):
+            calls.append(messages)
+            if len(calls) == 2:
+                raise OSError("connection reset")
+            mail.outbox.extend(messages)
+            return len(messages)
+
+        with mock.patch("django.core.mail.backends.locmem.EmailBackend.send_messages", send_messages), self.assertRaises(OSError):
+            send_due_reminders(today=date(2026, 6, 10))
+        self.assertEqual(list(ReminderLog.objects.values_list("owner__username", flat=True)), ["ana"])
+        self.assertEqual(send_due_reminders(today=date(2026, 6, 10), batch_size=1), 1)
+        self.assertEqual([message.to for message in mail.outbox], [["ana@example.com"], ["ben@example.com"]])
+
+
+class ExportCleanupTests(TestCase):
+    def setUp(self):
+        self.root = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        self.enterContext(override_settings(EXPORT_ROOT=self.root, EXPORT_STALL_MINUTES=30, EXPORT_TTL_HOURS=24))
+        self.user = get_user_model().objects.create(username="exporter")
+
+    def test_stalled_export_is_failed_and_its_partial_file_removed(self):
+        partial = self.root / "1-partial.csv"
+        partial.write_text("Date,")
+        export = ReportExport.objects.create(
+            owner=self.user, status=ReportExport.Status.RUNNING, file_name=partial.name, started_at=timezone.now() - timedelta(hours=1)
+        )
+        fresh = ReportExport.objects.create(owner=self.user, status=ReportExport.Status.RUNNING, started_at=timezone.now())
+
+        self.assertEqual(exports.fail_stalled(), 1)
+        export.refresh_from_db()
+        fresh.refresh_from_db()
+        self.assertEqual(export.status, ReportExport.Status.FAILED)
+        self.assertIsNotNone(export.expires_at)
+        self.assertFalse(partial.exists())
+        self.assertEqual(fresh.status, ReportExport.Status.RUNNING)
+
+    def test_failed_exports_and_stray_files_are_purged(self):
+        ReportExport.objects.create(owner=self.user, status=ReportExport.Status.FAILED, expires_at=timezone.now() - timedelta(minutes=1))
+        stray, recent = self.root / "9-stray.csv", self.root / "10-writing.csv"
+        stray.write_text("x")
+        recent.write_text("x")
+        old = (timezone.now() - timedelta(days=2)).timestamp()
+        os.utime(stray, (old, old))
+
+        self.assertEqual(exports.purge_expired(), 1)
+        self.assertFalse(ReportExport.objects.exists())
+        self.assertFalse(stray.exists())
+        self.assertTrue(recent.exists())
+
+    def test_failed_run_expires(self):
+        export = ReportExport.objects.create(owner=self.user, format="unknown")
+        with self.assertLogs("core.exports", "ERROR"):
+            exports.run_export(export.pk)
+        export.refresh_from_db()
+        self.assertEqual(export.status, ReportExport.Status.FAILED)
+        self.assertIsNotNone(export.expires_at)
+        self.assertEqual(list(self.root.iterdir()), [])
+
+    def test_job_failed_while_running_is_not_marked_ready(self):
+        export = ReportExport.objects.create(owner=self.user)
+
+        def stall(*args):
+            exports.fail_stalled(timezone.now() + timedelta(hours=1))
+            return iter(())
+
+        with mock.patch.object(exports, "iter_rows", stall):
+            exports.run_export(export.pk)
+        export.refresh_from_db()
+        self.assertEqual(export.status, ReportExport.Status.FAILED)
+        self.assertEqual(list(self.root.iterdir()), [])
+
+    def test_claimed_job_is_not_run_twice(self):
+        export = ReportExport.objects.create(owner=self.user)
+        exports.run_export(export.pk)
+        finished_at = ReportExport.objects.get(pk=export.pk).finished_at
+        exports.run_export(export.pk)
+        self.assertEqual(ReportExport.objects.get(pk=export.pk).finished_at, finished_at)
+        self.assertEqual(len(list(self.root.iterdir())), 1)
+
+    def test_rows_page_across_chunks_in_order(self):
+        for offset in range(3):
+            checkin = DailyCheckin.objects.create(owner=self.user, date=date(2026, 3, 1) + timedelta(days=offset))
+            for n in range(3):
+                MITSession.objects.create(daily_checkin=checkin, title=f"{offset}-{n}")
+        with mock.patch.object(exports, "CHUNK_SIZE", 2):
+            titles = [row[2] for row in exports.iter_rows(self.user)]
+        self.assertEqual(titles, [f"{offset}-{n}" for offset in (2, 1, 0) for n in range(3)])
+
+
+@override_settings(CACHES=consistency.ISOLATED_CACHES)
+class ArchiveTests(TransactionTestCase):
+    # Transactional: archive files are only swapped in once the batch commits.
+
+    def setUp(self):
+        self.root = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        self.enterContext(override_settings(SESSION_ARCHIVE_ROOT=self.root))
+        self.user = get_user_model().objects.create(username="archivist")
+        for day in (date(2024, 3, 1), date(2024, 3, 2), date(2025, 3, 1)):
+            checkin = DailyCheckin.objects.create(owner=self.user, date=day)
+            MITSession.objects.create(daily_checkin=checkin, title="Old", status=MITSession.Status.COMPLETED, actual_minutes=30)
+
+    def test_archives_each_year_and_removes_live_rows(self):
+        self.assertEqual(archive.archive_sessions(date(2026, 1, 1), owner=self.user), 3)
+        self.assertFalse(MITSession.objects.exists())
+        self.assertEqual(dict(SessionArchive.objects.values_list("year", "session_count")), {2024: 2, 2025: 1})
+        self.assertEqual(len(list(archive.archived_rows(self.user))), 3)
+        self.assertEqual(list(self.root.glob("*/*.pending")), [])
+
+    def test_failed_batch_leaves_published_archive_untouched(self):
+        archive.archive_sessions(date(2024, 3, 2), owner=self.user)
+        published = archive.archive_path(self.user.pk, 2024).read_bytes()
+        with mock.patch.object(archive.search, "unindex_sessions", side_effect=RuntimeError), self.assertRaises(RuntimeError):
+            archive.archive_sessions(date(2026, 1, 1), owner=self.user)
+        self.assertEqual(archive.archive_path(self.user.pk, 2024).read_bytes(), published)
+        self.assertEqual(MITSession.objects.count(), 2)
+        self.assertEqual(SessionArchive.objects.get(year=2024).session_count, 1)
+        self.assertEqual(list(self.root.glob("*/*.pending")), [])
+
+    def test_recover_pending_publishes_committed_and_drops_rolled_back(self):
+        archive.archive_sessions(date(2026, 1, 1), owner=self.user)
+        committed, stale = archive.archive_path(self.user.pk, 2024), archive.archive_path(self.user.pk, 2025)
+        os.replace(committed, committed.with_name("2024.ftta.pending"))
+        archive.write_archive(stale.with_name("2025.ftta.pending"), [])
+        archive.recover_pending(min_age_seconds=0)
+        self.assertTrue(committed.exists())
+        self.assertEqual(len(list(archive.archived_rows(self.user, year=2025))), 1)
+        self.assertEqual(list(self.root.glob("*/*.pending")), [])
+
+    def test_skill_with_only_archived_sessions_is_deactivated_not_deleted(self):
+        skill = Skill.objects.create(owner=self.user, name="Reading")
+        MITSession.objects.update(skill=skill)
+        archive.archive_sessions(date(2026, 1, 1), owner=self.user)
+        self.client.force_login(self.user)
+        self.client.post(reverse("focus_category_manage"), {"action": "delete", "skill_id": skill.pk})
+        skill.refresh_from_db()
+        self.assertFalse(skill.is_active)
+
+    def test_archived_rows_use_the_current_skill_name(self):
+        kept, dropped = Skill.objects.create(owner=self.user, name="Reading"), Skill.objects.create(owner=self.user, name="Chess")
+        MITSession.objects.filter(daily_checkin__date__year=2024).update(skill=kept)
+        MITSession.objects.filter(daily_checkin__date__year=2025).update(skill=dropped)
+        archive.archive_sessions(date(2026, 1, 1), owner=self.user)
+        Skill.objects.filter(pk=kept.pk).update(name="Deep reading")
+        dropped.delete()
+        names = {row["date"].year: row["skill_name"] for row in archive.archived_rows(self.user)}
+        self.assertEqual(names, {2024: "Deep reading", 2025: "Chess"})
+
+    def test_column_summaries(self):
+        MITSession.objects.create(daily_checkin=DailyCheckin.objects.get(date=date(2024, 3, 2)), title="Missed", status=MITSession.Status.SKIPPED)
+        archive.archive_sessions(date(2026, 1, 1), owner=self.user)
+        self.assertEqual(archive.monthly_completed_minutes(self.user), {date(2024, 3, 1): 60, date(2025, 3, 1): 30})
+        self.assertEqual(archive.completed_days(self.user, before=date(2025, 1, 1)), {date(2024, 3, 1): True, date(2024, 3, 2): False})
+
+
+@skipUnless(connection.vendor == "sqlite", "FTS5 triggers are SQLite-only")
+class SearchTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create(username="seeker")
+        self.checkin = DailyCheckin.objects.create(owner=self.user, date=date(2026, 6, 10))
+
+    def fts_ids(self, match):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT rowid FROM core_searchentry_fts WHERE core_searchentry_fts MATCH %s", [match])
+            return {row[0] for row in cursor.fetchall()}
+
+    def test_triggers_keep_fts_in_sync(self):
+        session = MITSession.objects.create(daily_checkin=self.checkin, title="Sketching practice")
+        entry = SearchEntry.objects.get(kind=SearchEntry.Kind.SESSION, object_id=session.pk)
+        self.assertEqual(self.fts_ids("sketching"), {entry.pk})
+
+        session.title = "Painting"
+        session.save()
+        self.assertEqual(self.fts_ids("sketching"), set())
+        self.assertEqual(self.fts_ids("painting"), {entry.pk})
+
+        session.delete()
+        self.assertEqual(self.fts_ids("painting"), set())
+
+    def test_results_are_limited_to_the_owner(self):
+        other = get_user_model().objects.create(username="neighbour")
+        MITSession.objects.create(daily_checkin=self.checkin, title="Sketching")
+        MITSession.objects.create(daily_checkin=DailyCheckin.objects.create(owner=other, date=date(2026, 6, 10)), title="Sketching")
+        results = search.search(self.user, "sketch")
+        self.assertEqual(results.count(), 1)
+        self.assertEqual([entry.owner_id for entry in results[0:10]], [self.user.pk])
+
+    def test_title_matches_rank_first_and_pages_do_not_overlap(self):
+        for n in range(24):
+            MITSession.objects.create(daily_checkin=self.checkin, title=f"Chores {n}", miss_reason="ran out of time for sketching")
+        titled = MITSession.objects.create(daily_checkin=self.checkin, title="Sketching")
+        paginator = Paginator(search.search(self.user, "sketching"), 20)
+        self.assertEqual((paginator.count, paginator.num_pages), (25, 2))
+        first, second = paginator.page(1).object_list, paginator.page(2).object_list
+        self.assertEqual(first[0].object_id, titled.pk)
+        self.assertEqual(len(second), 5)
+        self.assertEqual(len({entry.pk for entry in first} | {entry.pk for entry in second}), 25)
+
+
+@override_settings(CACHES=consistency.ISOLATED_CACHES)
+class TeamAccessTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.manager, self.member, self.peer, self.outsider = (User.objects.create(username=name) for name in ("mona", "milo", "pia", "otto"))
+        self.team = Team.objects.create(name="Studio", slug="studio")
+        TeamMembership.objects.create(team=self.team, user=self.manager, role=TeamMembership.Role.MANAGER)
+        TeamMembership.objects.create(team=self.team, user=self.member)
+        TeamMembership.objects.create(team=self.team, user=self.peer)
+
+    def get(self, viewer, name, *args):
+        self.client.force_login(viewer)
+        return self.client.get(reverse(name, args=[self.team.slug, *args]))
+
+    def test_member_cannot_view_another_member(self):
+        self.assertEqual(self.get(self.member, "team_member", "pia").status_code, 404)
+
+    def test_member_can_view_themself(self):
+        self.assertEqual(self.get(self.member, "team_member", "milo").status_code, 200)
+
+    def test_manager_can_view_a_member(self):
+        self.assertEqual(self.get(self.manager, "team_member", "pia").status_code, 200)
+
+    def test_only_managers_see_the_member_table(self):
+        self.assertIsNone(self.get(self.member, "team_dashboard").context["members"])
+        self.assertEqual(len(self.get(self.manager, "team_dashboard").context["members"]), 3)
+
+    def test_non_members_get_404(self):
+        self.assertEqual(self.get(self.outsider, "team_dashboard").status_code, 404)
+        self.assertEqual(self.get(self.outsider, "team_member", "milo").status_code, 404)
@@ -4,11 +4,21 @@ from . import views
 urlpatterns = [
     path("", views.landing, name="landing"),
     path("app/", views.home, name="home"),
+    path("api/goals/pacing/", views.goal_pacing, name="goal_pacing"),
     path("signup/", views.signup, name="signup"),
     path("checkins/new/", views.checkin_create, name="checkin_create"),
     path("checkins/<int:pk>/", views.checkin_detail, name="checkin_detail"),
     path("focus-categories/", views.focus_category_manage, name="focus_category_manage"),
     path("skills/", views.focus_category_manage, name="skill_manage"),
     path("summary/monthly/", views.monthly_summary, name="monthly_summary"),
+    path("exports/", views.export_list, name="export_list"),
+    path("exports/new/", views.export_create, name="export_create"),
+    path("exports/<int:pk>/", views.export_status, name="export_status"),
+    path("exports/<int:pk>/download/", views.export_download, name="export_download"),
+    path("search/", views.search_history, name="search"),
+    path("settings/", views.preferences, name="preferences"),
+    path("teams/", views.team_list, name="team_list"),
+    path("teams/<slug:slug>/", views.team_dashboard, name="team_dashboard"),
+    path("teams/<slug:slug>/members/<str:username>/", views.team_member, name="team_member"),
     
 ]
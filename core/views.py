@@ -1,68 +1,45 @@
-import csv
-from collections import defaultdict
-from datetime import date, datetime, timedelta
+from datetime import datetime
 
 from django.contrib import messages
 from django.contrib.auth import login
 from django.contrib.auth.decorators import login_required
-from django.db.models import Count, Q, Sum
-from django.db.models.functions import TruncMonth
-from django.http import HttpResponse
+from django.core.paginator import Paginator
+from django.db import IntegrityError, transaction
+from django.db.models import Count
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.utils import timezone
+from django.views.decorators.http import require_POST
 
-from .forms import DailyCheckinForm, MITSessionFormSet, SignUpForm, FocusCategoryForm
-from .models import DailyCheckin, MITSession, Skill
+from . import forecast, search
+from .cache import coalesced_bumps, fragment_cache
+from .dashboard import DashboardData
+from .periods import resolve_periods
+from .ratelimit import rate_limit
+from .forms import DailyCheckinForm, MITSessionFormSet, SignUpForm, FocusCategoryForm, UserPreferenceForm
+from .models import DailyCheckin, ReportExport, SessionArchive, Skill, TeamMembership, UserPreference
 
+# Report, export and team code is imported inside the views that use it, so a
+# worker only pays for it on first use (see `manage.py profile_startup`).
 
-def _is_checkin_completed(checkin):
-    mits = list(checkin.mits.all())
-    return len(mits) >= 1 and all(m.status == MITSession.Status.COMPLETED for m in mits)
 
-
-def _current_streak(user):
-    checkins = DailyCheckin.objects.filter(owner=user).prefetch_related("mits").order_by("-date")
-    if not checkins.exists():
-        return 0
-
-    streak = 0
-    expected_date = date.today()
-    checkin_map = {c.date: c for c in checkins}
-    while True:
-        checkin = checkin_map.get(expected_date)
-        if not checkin or not _is_checkin_completed(checkin):
-            break
-        streak += 1
-        expected_date = expected_date - timedelta(days=1)
-    return streak
-
-
-def _monthly_narrative(month_sessions, completion_rate):
-    completed_sessions = month_sessions.filter(status=MITSession.Status.COMPLETED)
-    if not completed_sessions.exists():
-        return "No Focused sessions logged this month yet. Start with one focused check-in today."
-
-    skill_minutes = (
-        completed_sessions.values("skill__name")
-        .annotate(actual=Sum("actual_minutes"))
-        .order_by("-actual")
-    )
-    top = next((s for s in skill_minutes if s["skill__name"] and (s["actual"] or 0) > 0), None)
-    lead = f"Top focus so far: {top['skill__name']} ({top['actual'] or 0} min)." if top else "You have planned MITs logged, but actual minutes are still sparse."
-
-    if completion_rate >= 80:
-        tone = "Strong consistency this month. Keep the same cadence."
-    elif completion_rate >= 60:
-        tone = "Good momentum. Tighten follow-through on skipped Focused Sessions."
-    else:
-        tone = "Execution is below target. Simplify tomorrow’s first Focused session and protect the first block."
-
-    return f"{lead} {tone}"
+LANDING_PAGE_KEY = "page:landing"
 
 
 def landing(request):
     if request.user.is_authenticated:
         return redirect("home")
-    return render(request, "core/landing.html")
+    # Every anonymous visitor sees the same page, unless a flash message (e.g. after logout) is waiting.
+    if messages.get_messages(request):
+        return render(request, "core/landing.html")
+    page_cache = fragment_cache()
+    content = page_cache.get(LANDING_PAGE_KEY)
+    if content is None:
+        response = render(request, "core/landing.html")
+        page_cache.set(LANDING_PAGE_KEY, response.content)
+        return response
+    return HttpResponse(content)
 
 
 def signup(request):
@@ -84,118 +61,39 @@ def signup(request):
 
 @login_required
 def home(request):
-    today = date.today()
-    week_start = today - timedelta(days=today.weekday())
-    week_end = week_start + timedelta(days=6)
-
-    week_sessions = MITSession.objects.filter(
-        daily_checkin__owner=request.user,
-        daily_checkin__date__range=(week_start, week_end),
-    )
-
-    month_sessions = MITSession.objects.filter(
-        daily_checkin__owner=request.user,
-        daily_checkin__date__year=today.year,
-        daily_checkin__date__month=today.month,
-    )
-
-    monthly_completion_summary = month_sessions.aggregate(
-        total=Count("id"),
-        completed=Count("id", filter=Q(status=MITSession.Status.COMPLETED)),
-    )
-    month_total = monthly_completion_summary["total"] or 0
-    month_completed = monthly_completion_summary["completed"] or 0
-    monthly_completion_rate = round((month_completed / month_total) * 100, 1) if month_total else 0
-
-    summary = week_sessions.aggregate(
-        total=Count("id"),
-        completed=Count("id", filter=Q(status=MITSession.Status.COMPLETED)),
-        actual_minutes=Sum("actual_minutes", filter=Q(status=MITSession.Status.COMPLETED)),
-    )
-
-    total = summary["total"] or 0
-    completed = summary["completed"] or 0
-    completion_rate = round((completed / total) * 100, 1) if total else 0
-    current_streak = _current_streak(request.user)
-
-    recent_mits = (
-        MITSession.objects.select_related("daily_checkin", "skill")
-        .filter(daily_checkin__owner=request.user, status=MITSession.Status.COMPLETED)
-        .order_by("-daily_checkin__date", "skill__name")[:9]
-    )
-
-    daily_trend_qs = (
-        week_sessions.values("daily_checkin__date")
-        .annotate(actual=Sum("actual_minutes"))
-        .order_by("daily_checkin__date")
-    )
-    daily_map = {r["daily_checkin__date"]: r["actual"] or 0 for r in daily_trend_qs}
-    trend_labels, trend_actual = [], []
-    for offset in range(7):
-        day = week_start + timedelta(days=offset)
-        trend_labels.append(day.strftime("%a %d"))
-        trend_actual.append(daily_map.get(day, 0))
-
-    monthly_trend_qs = (
-        MITSession.objects.filter(daily_checkin__owner=request.user, status=MITSession.Status.COMPLETED)
-        .annotate(month=TruncMonth("daily_checkin__date"))
-        .values("month")
-        .annotate(actual=Sum("actual_minutes"))
-        .order_by("month")
-    )
-    month_labels = [r["month"].strftime("%b %Y") for r in monthly_trend_qs]
-    month_actual = [r["actual"] or 0 for r in monthly_trend_qs]
-
-    skill_qs = week_sessions.filter(status=MITSession.Status.COMPLETED).values("skill__name").annotate(count=Count("id")).order_by("-count")
-    category_labels = [r["skill__name"] or "(No category)" for r in skill_qs]
-    category_data = [r["count"] for r in skill_qs]
-
-    goals = Skill.objects.filter(owner=request.user, is_active=True).order_by("name")
-    goal_progress = []
-    for g in goals:
-        actual = (
-            week_sessions.filter(skill=g, status=MITSession.Status.COMPLETED)
-            .aggregate(v=Sum("actual_minutes"))["v"]
-            or 0
-        )
-        target = g.weekly_goal_minutes or 0
-        pct = round((actual / target) * 100, 1) if target else 0
-        goal_progress.append({"name": g.name, "goal": target, "actual": actual, "pct": pct})
-
-    incomplete_sessions = (
-        week_sessions.exclude(status=MITSession.Status.COMPLETED)
-        .select_related("skill", "daily_checkin")
-        .order_by("-daily_checkin__date")
-    )
-
+    dashboard = DashboardData(request.user, request.periods)
     context = {
         "app_name": "Focused Time Tracker",
         "subtitle": "Track focused time with clarity, consistency, and momentum.",
-        "summary": summary,
-        "recent_mits": recent_mits,
-        "completion_rate": completion_rate,
-        "current_streak": current_streak,
-        "trend_labels": trend_labels,
-        "trend_actual": trend_actual,
-        "category_labels": category_labels,
-        "category_data": category_data,
-        "month_labels": month_labels,
-        "month_actual": month_actual,
-        "monthly_narrative": _monthly_narrative(month_sessions, monthly_completion_rate),
-        "goal_progress": goal_progress,
-        "week_range_label": f"{week_start:%b %d} – {week_end:%b %d}",
-        "incomplete_sessions": incomplete_sessions,
+        **dashboard.context(),
     }
     return render(request, "core/home.html", context)
 
 
 @login_required
+def goal_pacing(request):
+    try:
+        weeks = min(max(int(request.GET.get("weeks", forecast.DEFAULT_HISTORY_WEEKS)), 1), forecast.MAX_HISTORY_WEEKS)
+    except ValueError:
+        weeks = forecast.DEFAULT_HISTORY_WEEKS
+    periods = request.periods
+    return JsonResponse({
+        "today": periods.today.isoformat(),
+        "week_start": periods.week_start.isoformat(),
+        "week_end": periods.week_end.isoformat(),
+        "history_weeks": weeks,
+        "goals": forecast.goal_pacing(request.user, periods, weeks),
+    })
+
+
+@login_required
+@rate_limit()
 def checkin_create(request):
     selected_date = request.GET.get("date")
     try:
-        target_date = datetime.strptime(selected_date, "%Y-%m-%d").date() if selected_date else date.today()
+        target_date = datetime.strptime(selected_date, "%Y-%m-%d").date() if selected_date else request.periods.today
     except ValueError:
-        target_date = date.today()
+        target_date = request.periods.today
 
     checkin = DailyCheckin.objects.filter(owner=request.user, date=target_date).first()
     if not checkin:
@@ -207,15 +105,28 @@ def checkin_create(request):
 
         if form.is_valid() and formset.is_valid():
             candidate = form.save(commit=False)
-            existing_other = DailyCheckin.objects.filter(owner=request.user, date=candidate.date).exclude(pk=checkin.pk if checkin.pk else None).first()
-            if existing_other:
+            # The lookup above already covers target_date; only a moved date can collide.
+            if candidate.date != target_date and DailyCheckin.objects.filter(owner=request.user, date=candidate.date).exists():
                 messages.info(request, f"Loaded existing daily log for {candidate.date}. Add your MITs there.")
                 return redirect(f"/checkins/new/?date={candidate.date.isoformat()}")
 
-            candidate.owner = request.user
-            candidate.save()
-            formset.instance = candidate
-            formset.save()
+            checkin_changed = not checkin.pk or form.has_changed()
+            if not checkin_changed and not formset.has_changed():
+                messages.info(request, "No changes to save.")
+                return redirect(f"/checkins/new/?date={candidate.date.isoformat()}")
+
+            try:
+                with coalesced_bumps(), transaction.atomic():
+                    if checkin_changed:
+                        candidate.owner = request.user
+                        candidate.save()
+                    formset.instance = candidate
+                    # Inline formsets only write forms whose data changed.
+                    formset.save()
+            except IntegrityError:
+                # A concurrent request created this date first.
+                messages.info(request, f"Loaded existing daily log for {candidate.date}. Add your MITs there.")
+                return redirect(f"/checkins/new/?date={candidate.date.isoformat()}")
             messages.success(request, "Daily log saved.")
             return redirect(f"/checkins/new/?date={candidate.date.isoformat()}")
     else:
@@ -227,6 +138,7 @@ def checkin_create(request):
 
 
 @login_required
+@rate_limit()
 def focus_category_manage(request):
     edit_id = request.GET.get("edit")
     editing_skill = None
@@ -239,7 +151,9 @@ def focus_category_manage(request):
         if action == "delete":
             skill_id = request.POST.get("skill_id")
             skill = get_object_or_404(Skill, pk=skill_id, owner=request.user)
-            if skill.sessions.filter(daily_checkin__owner=request.user).exists():
+            from . import archive
+
+            if skill.sessions.filter(daily_checkin__owner=request.user).exists() or skill.pk in archive.archived_skill_ids(request.user):
                 skill.is_active = False
                 skill.save(update_fields=["is_active"])
                 messages.info(request, f"{skill.name} has history, so it was deactivated instead of deleted.")
@@ -274,41 +188,166 @@ def focus_category_manage(request):
 
 @login_required
 def monthly_summary(request):
+    from . import exports, reports
+
     month_str = request.GET.get("month", "")
-    sessions = MITSession.objects.select_related("daily_checkin", "skill").filter(daily_checkin__owner=request.user)
+    archive_filter = {}
 
     if month_str:
         try:
             selected = datetime.strptime(month_str, "%Y-%m").date()
-            sessions = sessions.filter(daily_checkin__date__year=selected.year, daily_checkin__date__month=selected.month)
+            archive_filter = {"year": selected.year, "month": selected.month}
         except ValueError:
             month_str = ""
 
     if request.GET.get("export") == "csv":
+        import csv
+
         response = HttpResponse(content_type="text/csv")
         response["Content-Disposition"] = f'attachment; filename="mit-summary-{month_str or "all"}.csv"'
         writer = csv.writer(response)
-        writer.writerow(["Date", "Focus Category", "Task", "Planned Minutes", "Actual Minutes", "Status", "Miss Reason"])
-        for s in sessions.order_by("-daily_checkin__date"):
-            writer.writerow([s.daily_checkin.date, s.skill.name if s.skill else "", s.title, s.planned_minutes, s.actual_minutes or "", s.get_status_display(), s.miss_reason])
+        writer.writerow(exports.CSV_HEADER)
+        for row in exports.iter_rows(request.user, **archive_filter):
+            writer.writerow(exports.csv_values(row))
         return response
 
-    rows = (
-        sessions.annotate(month=TruncMonth("daily_checkin__date"))
-        .values("month", "skill__name")
-        .annotate(
-            count=Count("id"),
-            completed=Count("id", filter=Q(status=MITSession.Status.COMPLETED)),
-            planned_minutes=Sum("planned_minutes"),
-            actual_minutes=Sum("actual_minutes"),
-        )
-        .order_by("-month", "skill__name")
-    )
-
-    return render(request, "core/monthly_summary.html", {"rows": rows, "selected_month": month_str})
+    rows = reports.monthly_summary_rows(request.user, **archive_filter)
+    return render(request, "core/monthly_summary.html", {"rows": rows, "selected_month": month_str, "export_formats": ReportExport.Format.choices})
 
 
 @login_required
 def checkin_detail(request, pk):
     checkin = get_object_or_404(DailyCheckin.objects.prefetch_related("mits__skill"), pk=pk, owner=request.user)
     return render(request, "core/checkin_detail.html", {"checkin": checkin})
+
+
+@login_required
+def search_history(request):
+    query = request.GET.get("q", "").strip()
+    page = Paginator(search.search(request.user, query), 20).get_page(request.GET.get("page"))
+    # Archived sessions leave the index (see archive.archive_sessions), so say which years are missing.
+    archived_years = list(SessionArchive.objects.filter(owner=request.user).order_by("year").values_list("year", flat=True))
+    return render(request, "core/search.html", {"query": query, "page": page, "archived_years": archived_years})
+
+
+@login_required
+@rate_limit()
+def preferences(request):
+    preference, _created = UserPreference.objects.get_or_create(owner=request.user)
+    if request.method == "POST":
+        form = UserPreferenceForm(request.POST, instance=preference)
+        if form.is_valid():
+            form.save()
+            messages.success(request, "Settings saved.")
+            return redirect("preferences")
+    else:
+        form = UserPreferenceForm(instance=preference)
+    return render(request, "core/preferences.html", {"form": form, "has_email": bool(request.user.email)})
+
+
+def _export_payload(export):
+    return {
+        "id": export.pk,
+        "status": export.status,
+        "status_label": export.get_status_display(),
+        "row_count": export.row_count,
+        "error": export.error,
+        "download_url": reverse("export_download", args=[export.pk]) if export.status == ReportExport.Status.READY else None,
+        "expires_at": export.expires_at.isoformat() if export.expires_at else None,
+    }
+
+
+@login_required
+def export_list(request):
+    report_exports = ReportExport.objects.filter(owner=request.user)[:20]
+    return render(request, "core/export_list.html", {"report_exports": report_exports, "export_formats": ReportExport.Format.choices})
+
+
+@login_required
+@require_POST
+@rate_limit()
+def export_create(request):
+    from . import exports
+
+    export_format = request.POST.get("format", ReportExport.Format.CSV)
+    if export_format not in ReportExport.Format.values:
+        messages.info(request, "Choose a supported export format.")
+        return redirect("export_list")
+
+    month_str = request.POST.get("month", "")
+    if month_str:
+        try:
+            datetime.strptime(month_str, "%Y-%m")
+        except ValueError:
+            month_str = ""
+
+    export = ReportExport.objects.create(
+        owner=request.user,
+        format=export_format,
+        month=month_str,
+        all_users=request.user.is_staff and request.POST.get("all_users") == "on",
+    )
+    exports.enqueue(export)
+    messages.success(request, "Export queued. It will be ready to download here shortly.")
+    return redirect("export_list")
+
+
+@login_required
+def export_status(request, pk):
+    export = get_object_or_404(ReportExport, pk=pk, owner=request.user)
+    return JsonResponse(_export_payload(export))
+
+
+@login_required
+def export_download(request, pk):
+    from . import exports
+
+    export = get_object_or_404(ReportExport, pk=pk, owner=request.user, status=ReportExport.Status.READY)
+    path = exports.export_root() / export.file_name
+    if (export.expires_at and export.expires_at < timezone.now()) or not path.exists():
+        raise Http404("This export has expired.")
+    return FileResponse(open(path, "rb"), as_attachment=True, filename=export.download_name)
+
+
+@login_required
+def team_list(request):
+    memberships = TeamMembership.objects.filter(user=request.user).select_related("team").annotate(member_count=Count("team__memberships"))
+    return render(request, "core/team_list.html", {"memberships": memberships})
+
+
+def _team_membership(request, slug):
+    return get_object_or_404(TeamMembership.objects.select_related("team"), team__slug=slug, user=request.user)
+
+
+@login_required
+def team_dashboard(request, slug):
+    from .teams import TeamDashboard
+
+    membership = _team_membership(request, slug)
+    is_manager = membership.role == TeamMembership.Role.MANAGER
+    dashboard = TeamDashboard(membership.team, request.periods, request.GET.get("scope", "week"))
+    # Plain members see the team totals; the per-member table is for managers.
+    context = {"is_manager": is_manager, **dashboard.context(include_members=is_manager)}
+    return render(request, "core/team_dashboard.html", context)
+
+
+@login_required
+def team_member(request, slug, username):
+    membership = _team_membership(request, slug)
+    target = get_object_or_404(TeamMembership.objects.select_related("user"), team=membership.team, user__username=username)
+    if target.user_id != request.user.pk and membership.role != TeamMembership.Role.MANAGER:
+        raise Http404("Only team managers can view other members.")
+    member = target.user
+    periods = request.periods if member.pk == request.user.pk else resolve_periods(member)
+    dashboard = DashboardData(member, periods)
+    context = {
+        "team": membership.team,
+        "member": member,
+        "summary": dashboard.summary,
+        "completion_rate": dashboard.completion_rate,
+        "current_streak": dashboard.current_streak,
+        "goal_progress": dashboard.goal_progress,
+        "incomplete_sessions": dashboard.incomplete_sessions,
+        "week_range_label": dashboard.week_range_label,
+    }
+    return render(request, "core/team_member.html", context)
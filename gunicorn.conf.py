@@ -0,0 +1,29 @@
+"""Gunicorn settings: ``gunicorn -c gunicorn.conf.py``.
+
+The app is imported once in the master (``preload_app``) and warmed before
+any worker forks, so every worker starts with the URLconf, views and
+compiled templates already in memory. Each worker then opens its own
+database connection before it accepts a request.
+"""
+
+import os
+
+wsgi_app = "mit_dashboard.wsgi:application"
+bind = os.environ.get("GUNICORN_BIND", "127.0.0.1:8000")
+workers = int(os.environ.get("GUNICORN_WORKERS", "2"))
+preload_app = True
+
+
+def when_ready(server):
+    # Master process, after the preload and before the first fork. No database
+    # connections here: they must not be shared across forked workers.
+    from core.startup import warm_up
+
+    warm_up(database=False)
+    server.log.info("Warmed URLconf and templates before forking workers")
+
+
+def post_worker_init(worker):
+    from core.startup import warm_up
+
+    warm_up(templates=False)
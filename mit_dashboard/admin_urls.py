@@ -0,0 +1,11 @@
+"""Admin URLconf, imported by the resolver the first time URLs are reversed or an /admin/ URL is resolved.
+
+Settings use ``LazyAdminConfig``, so ``admin.py`` modules are discovered
+here (or by the admin system check) instead of during ``django.setup()``.
+"""
+
+from django.contrib import admin
+
+admin.autodiscover()
+
+urlpatterns = admin.site.get_urls()
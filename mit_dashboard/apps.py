@@ -0,0 +1,24 @@
+from django.contrib.admin.apps import SimpleAdminConfig
+from django.contrib.admin.checks import check_admin_app, check_dependencies
+from django.core import checks
+
+
+def check_discovered_admin(app_configs, **kwargs):
+    """``check_admin_app`` after ``admin.py`` modules are imported.
+
+    Discovery is otherwise deferred to the admin URLconf, which ``check`` and
+    the test runner never load, so the registry would be empty here and every
+    ModelAdmin check would silently pass.
+    """
+    from django.contrib import admin
+
+    admin.autodiscover()
+    return check_admin_app(app_configs, **kwargs)
+
+
+class LazyAdminConfig(SimpleAdminConfig):
+    """Admin without discovery in ``django.setup()``; see ``mit_dashboard/admin_urls.py``."""
+
+    def ready(self):
+        checks.register(check_dependencies, checks.Tags.admin)
+        checks.register(check_discovered_admin, checks.Tags.admin)
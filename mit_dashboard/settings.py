@@ -37,7 +37,9 @@ ALLOWED_HOSTS = [
 # Application definition
 
 INSTALLED_APPS = [
-    'django.contrib.admin',
+    # Admin modules are discovered when the URLconf is first reversed or resolved (mit_dashboard/admin_urls.py)
+    # or when system checks run, not in django.setup(): web workers get them from warm_up in the master
+    'mit_dashboard.apps.LazyAdminConfig',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -53,6 +55,8 @@ MIDDLEWARE = [
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'core.middleware.UserPeriodsMiddleware',
+    'core.middleware.TemplateTimingMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -60,10 +64,20 @@ ROOT_URLCONF = 'mit_dashboard.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # Stock Django templates plus per-render timing (core/templating.py)
+        'BACKEND': 'core.templating.InstrumentedDjangoTemplates',
+        # Keep the stock alias; the default would be 'templating', after the backend's module
+        'NAME': 'django',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
+        'APP_DIRS': False,
         'OPTIONS': {
+            # Parse each template once per process; gunicorn.conf.py precompiles the busiest ones
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
@@ -73,6 +87,9 @@ TEMPLATES = [
     },
 ]
 
+# Renders slower than this are logged as warnings by the 'core.templating' logger
+TEMPLATE_SLOW_MS = 50
+
 WSGI_APPLICATION = 'mit_dashboard.wsgi.application'
 
 
@@ -83,10 +100,38 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Keep each worker's connection (opened by the warm-up hook in gunicorn.conf.py) across requests
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
 
+# Shared by every worker process so dashboard cache invalidation is seen everywhere
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        # Each active user holds 1 version key + 8 dashboard aggregates, and every write orphans the old
+        # aggregates until they are culled. The default MAX_ENTRIES (300) fits ~30 users, so culls kept
+        # evicting other users' version keys (safe, since a lost version only forces a recompute, but it
+        # empties their cache). 20,000 leaves room for ~2,000 active users with orphans to spare. It
+        # isn't free: every set() lists the cache directory to decide whether to cull, ~1 ms per 1,000
+        # files. Culling 1/10 at a time instead of 1/3 clears fewer live entries in one go.
+        'OPTIONS': {
+            'MAX_ENTRIES': 20_000,
+            'CULL_FREQUENCY': 10,
+        },
+    },
+    # Per-process memory for {% cache %} fragments and the anonymous landing page; cleared on every restart/deploy
+    'template_fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'template-fragments',
+        'TIMEOUT': 600,
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -140,6 +185,29 @@ STATIC_URL = '/static/'
 
 
 
+# Per-user, per-year columnar files written by `manage.py archive_sessions`
+SESSION_ARCHIVE_ROOT = BASE_DIR / 'archive'
+
+
+# Background report exports (see core/exports.py)
+EXPORT_ROOT = BASE_DIR / 'exports'
+EXPORT_WORKERS = 2
+EXPORT_TTL_HOURS = 24
+# RUNNING exports older than this are treated as abandoned by a dead worker
+EXPORT_STALL_MINUTES = 30
+
+
+# Per-user token buckets on write endpoints (see core/ratelimit.py): scope -> (burst, tokens per second)
+RATE_LIMITS = {
+    'writes': (20, 0.5),
+}
+
+
+# Outgoing mail for `manage.py send_reminders`; configure EMAIL_HOST etc. per deployment
+DEFAULT_FROM_EMAIL = 'Focused Time Tracker <no-reply@ftt.elivergara.net>'
+SITE_URL = 'https://ftt.elivergara.net'
+
+
 LOGIN_URL = '/accounts/login/'
 LOGIN_REDIRECT_URL = '/app/'
 LOGOUT_REDIRECT_URL = '/accounts/login/'
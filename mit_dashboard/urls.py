@@ -1,8 +1,10 @@
-from django.contrib import admin
 from django.urls import include, path
 
 urlpatterns = [
-    path("admin/", admin.site.urls),
+    # A dotted path (rather than admin.site.urls) keeps admin.py modules out of
+    # django.setup(), so management commands never load them; the resolver
+    # imports this when URLs are first used (core.startup.warm_up does that early).
+    path("admin/", ("mit_dashboard.admin_urls", "admin", "admin")),
     path("accounts/", include("django.contrib.auth.urls")),
     path("", include("core.urls")),
 ]